@@ -10,20 +10,34 @@ Key components:
     - find_openocd()         — Locate the OpenOCD binary
     - find_openocd_scripts() — Locate the scripts directory (interface/, target/)
     - run_openocd_command()  — Execute OpenOCD one-shot commands
+                               (run_openocd_command_bytes() for raw output)
     - start_openocd_server() — Launch persistent OpenOCD server
     - OpenOCDTclClient       — TCL RPC client (port 6666)
 """
 
+import errno
+import functools
 import glob
+import inspect
 import json
+import math
 import os
+import re
+import select
+import selectors
 import shutil
 import socket
 import subprocess
 import sys
 import time
+import types
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # Optional: stdlib json is used when orjson is absent
+    orjson = None
+
 
 # ===========================================================================
 # Default Configuration
@@ -38,16 +52,61 @@ TCL_RPC_PORT = 6666
 GDB_PORT = 3333
 TELNET_PORT = 4444
 
+# RTT channel → TCP port mapping (ch0 text, ch1 tokenized logs, ch2 telemetry)
+RTT_PORTS = {"ch0": 9090, "ch1": 9091, "ch2": 9092}
+
+# Commands that start RTT and expose every channel over TCP. Issued as one
+# batch — either a single "-c" chain at launch or one TCL RPC round trip.
+RTT_START_CMDS = ["rtt start"] + [
+    f"rtt server start {port} {ch}" for ch, port in enumerate(RTT_PORTS.values())
+]
+
+# Per-attempt connect timeout when polling a local OpenOCD port. Loopback
+# connects complete in well under a millisecond, so 50 ms is generous.
+PORT_PROBE_TIMEOUT = 0.05
+
+# Readiness polls back off exponentially: a warm OpenOCD answers within the
+# first few 10 ms ticks, a cold one is not hammered while it starts.
+POLL_BACKOFF_INITIAL = 0.01
+POLL_BACKOFF_MAX = 0.25
+
+
+# ===========================================================================
+# JSON Output
+# ===========================================================================
+
+def dumps_json(obj) -> str:
+    """Serialize a result dict to indented JSON for CLI output.
+
+    Uses orjson when installed (noticeably faster for --verbose results that
+    embed full OpenOCD logs), falling back to the stdlib json module.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(obj, indent=2)
+
+
+def loads_json(data):
+    """Parse one JSON document from str or bytes.
+
+    Uses orjson when installed, otherwise the stdlib json module. Both raise
+    a ValueError subclass on malformed input.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 # ===========================================================================
 # Project Root Discovery
 # ===========================================================================
 
+@functools.lru_cache(maxsize=None)
 def find_project_root() -> str:
     """Find the project root by looking for CMakeLists.txt + firmware/ directory.
 
     Searches from this file's location upward.
-    Returns absolute path to the project root.
+    Returns absolute path to the project root (cached after the first hit).
     Raises FileNotFoundError if not found.
     """
     current = Path(__file__).resolve().parent
@@ -68,6 +127,7 @@ def find_project_root() -> str:
 # OpenOCD Path Discovery
 # ===========================================================================
 
+@functools.lru_cache(maxsize=None)
 def find_openocd() -> str:
     """Find the OpenOCD binary.
 
@@ -77,6 +137,10 @@ def find_openocd() -> str:
         3. ~/.pico-sdk/openocd/*/openocd — Pico VS Code extension
         4. Raise FileNotFoundError with helpful message
 
+    A successful lookup is cached for the life of the process, so pipeline
+    stages and repeated tool calls skip the filesystem walk. Call
+    find_openocd.cache_clear() after changing $OPENOCD_PATH at runtime.
+
     Returns:
         Absolute path to the OpenOCD executable.
     """
@@ -112,6 +176,7 @@ def find_openocd() -> str:
     )
 
 
+@functools.lru_cache(maxsize=None)
 def find_openocd_scripts(openocd_path: str) -> str:
     """Find the OpenOCD scripts directory (contains interface/, target/).
 
@@ -122,6 +187,8 @@ def find_openocd_scripts(openocd_path: str) -> str:
         4. /opt/openocd/share/openocd/scripts/ (Docker layout)
         5. /usr/share/openocd/scripts/ (system install)
 
+    Results are cached per openocd_path, like find_openocd().
+
     Args:
         openocd_path: Absolute path to the OpenOCD binary.
 
@@ -337,6 +404,10 @@ def preflight_check(elf_path: str = None, check_elf_age: int = None,
 BOOT_MARKER_INIT = "[system_init]"
 BOOT_MARKER_VERSION = "=== AI-Optimized FreeRTOS"
 BOOT_MARKER_SCHEDULER = "Starting FreeRTOS scheduler"
+BOOT_MARKERS = (BOOT_MARKER_INIT, BOOT_MARKER_VERSION, BOOT_MARKER_SCHEDULER)
+
+# One alternation matches every boot marker in a single pass over new text
+_BOOT_MARKER_RE = re.compile("|".join(re.escape(m) for m in BOOT_MARKERS))
 
 
 def wait_for_rtt_ready(tcl_port: int = TCL_RPC_PORT,
@@ -355,7 +426,8 @@ def wait_for_rtt_ready(tcl_port: int = TCL_RPC_PORT,
     Args:
         tcl_port: OpenOCD TCL RPC port (default: 6666).
         timeout: Maximum wait time in seconds (default: 15).
-        poll_interval: Time between polls in seconds (default: 0.5).
+        poll_interval: Upper bound on the delay between polls in seconds
+            (default: 0.5). Polls start 10 ms apart and back off towards it.
         verbose: Print polling progress to stderr.
 
     Returns:
@@ -367,6 +439,7 @@ def wait_for_rtt_ready(tcl_port: int = TCL_RPC_PORT,
     """
     start_time = time.monotonic()
     deadline = start_time + timeout
+    delay = POLL_BACKOFF_INITIAL
     
     # First check if OpenOCD is even running
     if not is_openocd_running(tcl_port):
@@ -426,7 +499,8 @@ def wait_for_rtt_ready(tcl_port: int = TCL_RPC_PORT,
                     print(f"\r  RTT: Scanning for control block... ({elapsed:.1f}s)", 
                           end="", file=sys.stderr)
             
-            time.sleep(poll_interval)
+            time.sleep(delay)
+            delay = min(delay * 1.5, poll_interval)
         
         # Timeout
         client.close()
@@ -474,13 +548,19 @@ def wait_for_boot_marker(rtt_port: int = 9090,
         dict with:
             found (bool): True if marker was found.
             boot_log (str): All captured text up to and including the marker.
+            markers_seen (list): Boot markers observed, in order of appearance.
             elapsed_seconds (float): Time spent waiting.
             error (str or None): Error message if failed.
     """
     start_time = time.monotonic()
     deadline = start_time + timeout
     boot_log = ""
+    markers_seen = []
     sock = None
+
+    # Only newly received text is scanned; keep enough of the previous tail
+    # to catch a marker split across two recv() chunks.
+    overlap = max(len(m) for m in BOOT_MARKERS + (marker,)) - 1
     
     # Retry connection (port may not be ready immediately)
     connection_timeout = min(5, timeout)
@@ -513,18 +593,26 @@ def wait_for_boot_marker(rtt_port: int = 9090,
                 
                 # Decode as UTF-8 text
                 text = chunk.decode("utf-8", errors="replace")
+                scan_from = max(0, len(boot_log) - overlap)
                 boot_log += text
                 
                 if verbose:
                     print(text, end="", file=sys.stderr)
                 
-                # Check if marker is in the accumulated log
-                if marker in boot_log:
+                # Record every boot marker in the new text with one regex
+                # pass. The requested marker is searched for on its own: it
+                # may overlap a boot marker, which an alternation would hide.
+                for m in _BOOT_MARKER_RE.finditer(boot_log, scan_from):
+                    if m.group(0) not in markers_seen:
+                        markers_seen.append(m.group(0))
+
+                if boot_log.find(marker, scan_from) != -1:
                     sock.close()
                     elapsed = time.monotonic() - start_time
                     return {
                         "found": True,
                         "boot_log": boot_log,
+                        "markers_seen": markers_seen,
                         "elapsed_seconds": elapsed,
                         "error": None,
                     }
@@ -553,6 +641,7 @@ def wait_for_boot_marker(rtt_port: int = 9090,
         return {
             "found": False,
             "boot_log": boot_log,
+            "markers_seen": markers_seen,
             "elapsed_seconds": elapsed,
             "error": f"Boot marker '{marker}' not found within {timeout}s",
             "advisory": advisory,
@@ -573,12 +662,40 @@ def wait_for_boot_marker(rtt_port: int = 9090,
 # OpenOCD Process Management
 # ===========================================================================
 
+def wait_process(proc: subprocess.Popen, timeout: float = None) -> int:
+    """Wait for proc to exit, like proc.wait(timeout).
+
+    Popen.wait() with a timeout polls waitpid() in a sleep loop. On Linux
+    (5.3+) this instead polls a pidfd, which becomes readable the moment
+    the child exits, so the caller wakes immediately. Falls back to
+    proc.wait() where pidfds are unavailable.
+
+    Raises:
+        subprocess.TimeoutExpired: If proc is still running after timeout.
+    """
+    pidfd_open = getattr(os, "pidfd_open", None)
+    if timeout is None or pidfd_open is None or proc.returncode is not None:
+        return proc.wait(timeout)
+    try:
+        pidfd = pidfd_open(proc.pid)
+    except OSError:
+        return proc.wait(timeout)
+    try:
+        poller = select.poll()
+        poller.register(pidfd, select.POLLIN)
+        if not poller.poll(math.ceil(max(0.0, timeout) * 1000)):
+            raise subprocess.TimeoutExpired(proc.args, timeout)
+    finally:
+        os.close(pidfd)
+    return proc.wait()
+
+
 def run_openocd_command(args: list, timeout: int = 30,
                         openocd_path: str = None, scripts_dir: str = None) -> dict:
     """Run OpenOCD as a one-shot command (e.g., program ... exit).
 
     Args:
-        args: Additional arguments for OpenOCD (e.g., ['-c', 'init; targets; shutdown']).
+        args: Additional arguments for OpenOCD (e.g., ['-c', 'init; shutdown']).
         timeout: Maximum execution time in seconds.
         openocd_path: Path to OpenOCD binary (auto-detected if None).
         scripts_dir: Path to scripts directory (auto-detected if None).
@@ -586,6 +703,25 @@ def run_openocd_command(args: list, timeout: int = 30,
     Returns:
         dict with keys: exit_code, stdout, stderr, duration_ms
     """
+    result = run_openocd_command_bytes(args, timeout=timeout,
+                                       openocd_path=openocd_path,
+                                       scripts_dir=scripts_dir)
+    result["stdout"] = result["stdout"].decode("utf-8", errors="replace")
+    result["stderr"] = result["stderr"].decode("utf-8", errors="replace")
+    return result
+
+
+def run_openocd_command_bytes(args: list, timeout: int = 30,
+                              openocd_path: str = None,
+                              scripts_dir: str = None) -> dict:
+    """Like run_openocd_command(), but stdout/stderr are returned as bytes.
+
+    Lets callers that only pattern-match OpenOCD's (often tens of KB)
+    output skip decoding it.
+
+    Returns:
+        dict with keys: exit_code, stdout (bytes), stderr (bytes), duration_ms
+    """
     if openocd_path is None:
         openocd_path = find_openocd()
     if scripts_dir is None:
@@ -595,34 +731,74 @@ def run_openocd_command(args: list, timeout: int = 30,
 
     start_time = time.monotonic()
     try:
-        result = subprocess.run(
+        proc = subprocess.Popen(
             cmd,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            close_fds=False,  # Skip the fd-closing loop; only inheritable fds pass
         )
-        duration_ms = int((time.monotonic() - start_time) * 1000)
+    except FileNotFoundError:
         return {
-            "exit_code": result.returncode,
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-            "duration_ms": duration_ms,
+            "exit_code": -2,
+            "stdout": b"",
+            "stderr": f"OpenOCD binary not found: {openocd_path}".encode(),
+            "duration_ms": 0,
         }
-    except subprocess.TimeoutExpired:
-        duration_ms = int((time.monotonic() - start_time) * 1000)
+
+    # Multiplex both pipes until OpenOCD closes them, then wait for its real
+    # exit status. "shutdown command invoked" is printed on failure paths
+    # too (e.g. program ... exit runs "shutdown error"), so it says nothing
+    # about success, and error text may still follow it.
+    buffers = {proc.stdout: bytearray(), proc.stderr: bytearray()}
+    stderr_buf = buffers[proc.stderr]
+    timed_out = False
+    deadline = start_time + timeout
+
+    with selectors.DefaultSelector() as sel:
+        sel.register(proc.stdout, selectors.EVENT_READ)
+        sel.register(proc.stderr, selectors.EVENT_READ)
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            for key, _ in sel.select(remaining):
+                chunk = os.read(key.fd, 65536)
+                if not chunk:
+                    sel.unregister(key.fileobj)
+                    continue
+                buffers[key.fileobj].extend(chunk)
+
+    if timed_out:
+        proc.kill()
+        proc.wait()
+        exit_code = None
+    else:
+        try:
+            exit_code = wait_process(proc, max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+            exit_code = None
+
+    proc.stdout.close()
+    proc.stderr.close()
+    duration_ms = int((time.monotonic() - start_time) * 1000)
+
+    if exit_code is None:
         return {
             "exit_code": -1,
-            "stdout": "",
-            "stderr": f"OpenOCD timed out after {timeout}s",
+            "stdout": b"",
+            "stderr": f"OpenOCD timed out after {timeout}s".encode(),
             "duration_ms": duration_ms,
         }
-    except FileNotFoundError:
-        return {
-            "exit_code": -2,
-            "stdout": "",
-            "stderr": f"OpenOCD binary not found: {openocd_path}",
-            "duration_ms": 0,
-        }
+
+    return {
+        "exit_code": exit_code,
+        "stdout": bytes(buffers[proc.stdout]),
+        "stderr": bytes(stderr_buf),
+        "duration_ms": duration_ms,
+    }
 
 
 def start_openocd_server(probe_cfg: str = None, extra_cfgs: list = None,
@@ -683,13 +859,52 @@ def start_openocd_server(probe_cfg: str = None, extra_cfgs: list = None,
         cmd,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
+        close_fds=False,  # Skip the fd-closing loop; only inheritable fds pass
     )
     return proc
 
 
+def _tcp_probe(port: int, host: str = "localhost",
+               timeout: float = PORT_PROBE_TIMEOUT) -> bool:
+    """Return True if something is listening on host:port.
+
+    Uses a nonblocking connect: a refused loopback connect fails
+    immediately, and an in-progress one is given at most `timeout` seconds
+    to complete.
+    """
+    try:
+        addrs = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except OSError:
+        return False
+    for family, socktype, proto, _, addr in addrs:
+        sock = socket.socket(family, socktype, proto)
+        try:
+            sock.setblocking(False)
+            err = sock.connect_ex(addr)
+            if err in (errno.EINPROGRESS, errno.EAGAIN, errno.EWOULDBLOCK):
+                sel = selectors.DefaultSelector()
+                try:
+                    sel.register(sock, selectors.EVENT_WRITE)
+                    if not sel.select(timeout):
+                        continue
+                finally:
+                    sel.close()
+                err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if err == 0:
+                return True
+        except OSError:
+            continue
+        finally:
+            sock.close()
+    return False
+
+
 def wait_for_openocd_ready(port: int = TCL_RPC_PORT, timeout: int = 10) -> bool:
     """Wait for OpenOCD TCL RPC port to accept connections.
 
+    Polls with exponential backoff (10 ms, growing 1.5x per attempt up to 250 ms), so an
+    already-warm server is detected almost immediately.
+
     Args:
         port: TCP port to poll (default: 6666).
         timeout: Maximum wait time in seconds.
@@ -698,14 +913,15 @@ def wait_for_openocd_ready(port: int = TCL_RPC_PORT, timeout: int = 10) -> bool:
         True if port is accepting connections, False on timeout.
     """
     deadline = time.monotonic() + timeout
-    while time.monotonic() < deadline:
-        try:
-            sock = socket.create_connection(("localhost", port), timeout=1)
-            sock.close()
+    delay = POLL_BACKOFF_INITIAL
+    while True:
+        if _tcp_probe(port):
             return True
-        except (ConnectionRefusedError, OSError, socket.timeout):
-            time.sleep(0.2)
-    return False
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 1.5, POLL_BACKOFF_MAX)
 
 
 def is_openocd_running(port: int = TCL_RPC_PORT) -> bool:
@@ -717,12 +933,7 @@ def is_openocd_running(port: int = TCL_RPC_PORT) -> bool:
     Returns:
         True if port is accepting connections.
     """
-    try:
-        sock = socket.create_connection(("localhost", port), timeout=1)
-        sock.close()
-        return True
-    except (ConnectionRefusedError, OSError, socket.timeout):
-        return False
+    return _tcp_probe(port, timeout=1.0)
 
 
 # ===========================================================================
@@ -779,6 +990,20 @@ class OpenOCDTclClient:
             data += chunk
         return data[:-1].decode("utf-8").strip()
 
+    def send_batch(self, cmds: list) -> str:
+        """Send several TCL commands in a single round trip.
+
+        The commands are joined with ';' so OpenOCD evaluates them as one
+        script and replies once, saving a terminator exchange per command.
+
+        Args:
+            cmds: List of TCL command strings.
+
+        Returns:
+            Response string of the last command in the batch.
+        """
+        return self.send("; ".join(cmds))
+
     def read_memory(self, address: int, width: int = 32, count: int = 1) -> list:
         """Read memory from the target.
 
@@ -862,6 +1087,36 @@ class OpenOCDTclClient:
 # Self-Test (no hardware needed)
 # ===========================================================================
 
+# Functions other HIL tools import from this module
+_REQUIRED_API = frozenset({
+    "find_project_root",
+    "find_openocd",
+    "find_openocd_scripts",
+    "find_arm_toolchain",
+    "preflight_check",
+    "wait_for_rtt_ready",
+    "wait_for_boot_marker",
+    "run_openocd_command",
+    "run_openocd_command_bytes",
+    "start_openocd_server",
+    "wait_for_openocd_ready",
+    "is_openocd_running",
+    "wait_process",
+})
+
+
+# Constants other tools and the firmware rely on; checked by the self-test
+_EXPECTED_CONSTANTS = types.MappingProxyType({
+    "TCL_RPC_PORT": 6666,
+    "GDB_PORT": 3333,
+    "DEFAULT_ADAPTER_SPEED": 5000,
+    "DEFAULT_ELF_PATH": "build/firmware/app/firmware.elf",
+    "BOOT_MARKER_INIT": "[system_init]",
+    "BOOT_MARKER_VERSION": "=== AI-Optimized FreeRTOS",
+    "BOOT_MARKER_SCHEDULER": "Starting FreeRTOS scheduler",
+})
+
+
 def _self_test():
     """Run basic self-tests without hardware.
 
@@ -872,7 +1127,7 @@ def _self_test():
     print("=" * 60)
 
     # Test 1: Project root discovery
-    print("\n[1/5] Project root discovery...")
+    print("\n[1/7] Project root discovery...")
     try:
         root = find_project_root()
         print(f"  ✓ Project root: {root}")
@@ -880,7 +1135,7 @@ def _self_test():
         print(f"  ✗ {e}")
 
     # Test 2: OpenOCD binary discovery
-    print("\n[2/5] OpenOCD binary discovery...")
+    print("\n[2/7] OpenOCD binary discovery...")
     try:
         openocd = find_openocd()
         print(f"  ✓ OpenOCD binary: {openocd}")
@@ -890,7 +1145,7 @@ def _self_test():
         openocd = None
 
     # Test 3: Scripts directory discovery
-    print("\n[3/5] OpenOCD scripts directory discovery...")
+    print("\n[3/7] OpenOCD scripts directory discovery...")
     if openocd:
         try:
             scripts = find_openocd_scripts(openocd)
@@ -901,13 +1156,14 @@ def _self_test():
         print("  ⊘ Skipped (no OpenOCD binary found)")
 
     # Test 4: TCL RPC client class
-    print("\n[4/5] TCL RPC client class instantiation...")
+    print("\n[4/7] TCL RPC client class instantiation...")
     try:
         # Just verify the class can be imported and attributes exist
         client_cls = OpenOCDTclClient
         assert hasattr(client_cls, "TERMINATOR")
         assert client_cls.TERMINATOR == b"\x1a"
         assert hasattr(client_cls, "send")
+        assert hasattr(client_cls, "send_batch")
         assert hasattr(client_cls, "read_memory")
         assert hasattr(client_cls, "write_memory")
         assert hasattr(client_cls, "halt")
@@ -918,18 +1174,19 @@ def _self_test():
     except AssertionError:
         print("  ✗ OpenOCDTclClient class incomplete")
 
-    # Test 5: Constants
-    print("\n[5/6] Constants verification...")
-    assert TCL_RPC_PORT == 6666
-    assert GDB_PORT == 3333
-    assert DEFAULT_ADAPTER_SPEED == 5000
-    assert DEFAULT_ELF_PATH == "build/firmware/app/firmware.elf"
-    print(f"  ✓ TCL_RPC_PORT={TCL_RPC_PORT}, GDB_PORT={GDB_PORT}")
-    print(f"  ✓ DEFAULT_ADAPTER_SPEED={DEFAULT_ADAPTER_SPEED}")
-    print(f"  ✓ DEFAULT_ELF_PATH={DEFAULT_ELF_PATH}")
+    # Test 5: Constants (ports, defaults, boot markers)
+    print("\n[5/7] Constants verification...")
+    module_globals = globals()
+    wrong = [name for name, expected in _EXPECTED_CONSTANTS.items()
+             if module_globals.get(name) != expected]
+    if wrong:
+        print(f"  ✗ Unexpected values: {', '.join(wrong)}")
+    else:
+        print("\n".join(f"  ✓ {name}={value}"
+                        for name, value in _EXPECTED_CONSTANTS.items()))
 
     # Test 6: ARM toolchain discovery
-    print("\n[6/10] ARM toolchain discovery...")
+    print("\n[6/7] ARM toolchain discovery...")
     try:
         addr2line = find_arm_toolchain("arm-none-eabi-addr2line")
         print(f"  ✓ addr2line binary: {addr2line}")
@@ -937,41 +1194,15 @@ def _self_test():
         print(f"  ✗ Not found (expected in CI/Docker-less environments)")
         print(f"    {e.args[0].split(chr(10))[0]}")
 
-    # Test 7: preflight_check function
-    print("\n[7/10] preflight_check function...")
-    try:
-        assert callable(preflight_check)
-        print(f"  ✓ preflight_check() function is callable")
-    except (AssertionError, NameError):
-        print(f"  ✗ preflight_check() function not found")
-
-    # Test 8: wait_for_rtt_ready function
-    print("\n[8/10] wait_for_rtt_ready function...")
-    try:
-        assert callable(wait_for_rtt_ready)
-        print(f"  ✓ wait_for_rtt_ready() function is callable")
-    except (AssertionError, NameError):
-        print(f"  ✗ wait_for_rtt_ready() function not found")
-
-    # Test 9: wait_for_boot_marker function
-    print("\n[9/10] wait_for_boot_marker function...")
-    try:
-        assert callable(wait_for_boot_marker)
-        print(f"  ✓ wait_for_boot_marker() function is callable")
-    except (AssertionError, NameError):
-        print(f"  ✗ wait_for_boot_marker() function not found")
-
-    # Test 10: Boot marker constants
-    print("\n[10/10] Boot marker constants verification...")
-    try:
-        assert BOOT_MARKER_INIT == "[system_init]"
-        assert BOOT_MARKER_VERSION == "=== AI-Optimized FreeRTOS"
-        assert BOOT_MARKER_SCHEDULER == "Starting FreeRTOS scheduler"
-        print(f"  ✓ BOOT_MARKER_INIT={BOOT_MARKER_INIT}")
-        print(f"  ✓ BOOT_MARKER_VERSION={BOOT_MARKER_VERSION}")
-        print(f"  ✓ BOOT_MARKER_SCHEDULER={BOOT_MARKER_SCHEDULER}")
-    except (AssertionError, NameError):
-        print(f"  ✗ Boot marker constants not defined correctly")
+    # Test 7: Public API functions
+    print("\n[7/7] Public API functions...")
+    module = sys.modules[__name__]
+    available = {name for name, obj in inspect.getmembers(module, callable)}
+    missing = sorted(_REQUIRED_API - available)
+    if missing:
+        print(f"  ✗ Missing functions: {', '.join(missing)}")
+    else:
+        print(f"  ✓ All {len(_REQUIRED_API)} public functions are callable")
 
     print("\n" + "=" * 60)
     print("Self-test complete.")
@@ -13,7 +13,6 @@ Usage:
 """
 
 import argparse
-import json
 import os
 import re
 import sys
@@ -21,18 +20,29 @@ import time
 
 # Allow running from project root or tools/hil/
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from openocd_utils import find_openocd, find_openocd_scripts, run_openocd_command
+from openocd_utils import (
+    dumps_json,
+    find_openocd,
+    find_openocd_scripts,
+    run_openocd_command_bytes,
+)
 
 
 # ===========================================================================
 # Probe Check Logic
 # ===========================================================================
 
+# OpenOCD output is matched as raw bytes; only the verbose path decodes it.
+_RE_VERSION = re.compile(rb"Open On-Chip Debugger (\S+)")
+_RE_CORES = re.compile(rb"rp2040\.core[01]")
+
 def check_probe_connectivity(openocd_path: str = None, verbose: bool = False) -> dict:
     """Verify Debug Probe connectivity to RP2040 target.
 
-    Runs OpenOCD with a short init/targets/shutdown sequence and parses
-    the output for target information.
+    Runs OpenOCD with a bare init/shutdown sequence and parses the init
+    output for target information. The "[rp2040.coreN] ... processor
+    detected" lines are printed during init, so no target-level commands
+    are needed and the running firmware is left undisturbed.
 
     Args:
         openocd_path: Path to OpenOCD binary (auto-detected if None).
@@ -63,12 +73,12 @@ def check_probe_connectivity(openocd_path: str = None, verbose: bool = False) ->
         }
 
     # Run OpenOCD probe check
-    result = run_openocd_command(
+    result = run_openocd_command_bytes(
         args=[
             "-f", "interface/cmsis-dap.cfg",
             "-f", "target/rp2040.cfg",
             "-c", "adapter speed 5000",
-            "-c", "init; targets; shutdown",
+            "-c", "init; shutdown",
         ],
         timeout=15,
         openocd_path=openocd_path,
@@ -78,15 +88,16 @@ def check_probe_connectivity(openocd_path: str = None, verbose: bool = False) ->
     duration_ms = int((time.monotonic() - start_time) * 1000)
 
     # Parse OpenOCD output (most info goes to stderr)
-    combined_output = result["stdout"] + "\n" + result["stderr"]
+    combined_output = result["stdout"] + b"\n" + result["stderr"]
 
     # Extract OpenOCD version
-    version_match = re.search(r"Open On-Chip Debugger (\S+)", combined_output)
-    openocd_version = version_match.group(1) if version_match else "unknown"
+    version_match = _RE_VERSION.search(combined_output)
+    openocd_version = "unknown"
+    if version_match:
+        openocd_version = version_match.group(1).decode("ascii", errors="replace")
 
-    # Check for success: look for target cores
-    cores = re.findall(r"(rp2040\.core[01])", combined_output)
-    cores = sorted(set(cores))
+    # Check for success: look for target cores reported during init
+    cores = sorted({c.decode("ascii") for c in _RE_CORES.findall(combined_output)})
 
     if result["exit_code"] == 0 and cores:
         response = {
@@ -115,24 +126,26 @@ def check_probe_connectivity(openocd_path: str = None, verbose: bool = False) ->
         }
 
     if verbose:
-        response["openocd_stdout"] = result["stdout"]
-        response["openocd_stderr"] = result["stderr"]
+        response["openocd_stdout"] = result["stdout"].decode("utf-8", errors="replace")
+        response["openocd_stderr"] = result["stderr"].decode("utf-8", errors="replace")
         response["openocd_exit_code"] = result["exit_code"]
 
     return response
 
 
-def _classify_error(output: str) -> tuple:
+def _classify_error(output: bytes) -> tuple:
     """Classify OpenOCD error output into a user-friendly message and suggestions.
 
     Args:
-        output: Combined stdout + stderr from OpenOCD.
+        output: Combined stdout + stderr from OpenOCD (raw bytes).
 
     Returns:
         Tuple of (error_message, suggestions_list).
     """
+    lower = output.lower()
+
     # No CMSIS-DAP device found
-    if "no device found" in output.lower() or "unable to open cmsis-dap" in output.lower():
+    if b"no device found" in lower or b"unable to open cmsis-dap" in lower:
         return (
             "No CMSIS-DAP device found. Check USB connection and udev rules.",
             [
@@ -144,7 +157,7 @@ def _classify_error(output: str) -> tuple:
         )
 
     # Target not connected (SWD wires not connected to Pico)
-    if "cannot read idr" in output.lower() or "error connecting dp" in output.lower():
+    if b"cannot read idr" in lower or b"error connecting dp" in lower:
         return (
             "Debug Probe found but RP2040 target not responding. Check SWD wiring.",
             [
@@ -155,7 +168,7 @@ def _classify_error(output: str) -> tuple:
         )
 
     # Another OpenOCD instance is running
-    if "unable to open" in output.lower() and "already in use" in output.lower():
+    if b"unable to open" in lower and b"already in use" in lower:
         return (
             "Debug Probe is in use by another process (likely another OpenOCD instance).",
             [
@@ -165,7 +178,7 @@ def _classify_error(output: str) -> tuple:
         )
 
     # libhidapi missing
-    if "libhidapi" in output.lower():
+    if b"libhidapi" in lower:
         return (
             "libhidapi library not found. Required for CMSIS-DAP interface.",
             [
@@ -174,7 +187,7 @@ def _classify_error(output: str) -> tuple:
         )
 
     # Timeout
-    if "timed out" in output.lower():
+    if b"timed out" in lower:
         return (
             "OpenOCD timed out waiting for target response.",
             [
@@ -186,12 +199,10 @@ def _classify_error(output: str) -> tuple:
 
     # Generic fallback
     # Extract first error line from OpenOCD output
-    error_lines = [
-        line.strip() for line in output.split("\n")
-        if "error" in line.lower() or "Error" in line
-    ]
-    if error_lines:
-        return (error_lines[0], ["Check OpenOCD output with --verbose for details"])
+    for line in output.split(b"\n"):
+        if b"error" in line.lower():
+            return (line.strip().decode("utf-8", errors="replace"),
+                    ["Check OpenOCD output with --verbose for details"])
 
     return (
         "Unknown error — OpenOCD exited with non-zero status.",
@@ -242,7 +253,7 @@ Examples:
 
     # Output
     if args.json:
-        print(json.dumps(result, indent=2))
+        print(dumps_json(result))
     else:
         if result["connected"]:
             print(f"✓ Debug Probe connected to {result['target']}")
@@ -3,7 +3,9 @@
 reset.py — BB3: Target Reset Utility
 
 Performs a clean reset cycle: kill OpenOCD → reset target → wait for boot
-→ optionally restart OpenOCD with RTT. This is the "restart and observe"
+→ optionally leave OpenOCD running with RTT. With --with-rtt, one persistent
+OpenOCD server performs the reset over TCL RPC and then serves RTT, so the
+adapter is only initialized once. This is the "restart and observe"
 convenience tool for firmware iteration.
 
 Advantages over reflashing:
@@ -19,7 +21,6 @@ Usage:
 
 import argparse
 import atexit
-import json
 import os
 import signal
 import subprocess
@@ -31,12 +32,17 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from openocd_utils import (
     DEFAULT_PROBE_CFG,
     DEFAULT_RTT_CFG,
+    RTT_PORTS,
+    RTT_START_CMDS,
+    OpenOCDTclClient,
     find_project_root,
     preflight_check,
     start_openocd_server,
     wait_for_openocd_ready,
     wait_for_rtt_ready,
+    wait_process,
     TCL_RPC_PORT,
+    dumps_json,
 )
 
 # Import reset_target from flash.py
@@ -56,7 +62,7 @@ def _cleanup():
     if _openocd_proc is not None:
         try:
             _openocd_proc.terminate()
-            _openocd_proc.wait(timeout=5)
+            wait_process(_openocd_proc, 5)
         except Exception:
             try:
                 _openocd_proc.kill()
@@ -83,17 +89,20 @@ signal.signal(signal.SIGTERM, _signal_handler)
 
 def reset_and_observe(with_rtt: bool = False, boot_wait: int = 3,
                       verbose: bool = False) -> dict:
-    """Kill OpenOCD, reset target, optionally restart with RTT.
+    """Kill OpenOCD, reset target, optionally keep OpenOCD running with RTT.
+
+    Without RTT, the reset is a one-shot OpenOCD command. With RTT, a single
+    persistent OpenOCD server is started first and the reset is issued over
+    TCL RPC, so the adapter is initialized once for both reset and RTT.
 
     Args:
-        with_rtt: Start OpenOCD with RTT after reset.
+        with_rtt: Leave OpenOCD running with RTT servers after reset.
         boot_wait: Seconds to wait for firmware boot.
         verbose: Print progress.
 
     Returns:
         dict with reset status and details.
     """
-    global _openocd_proc
     start_time = time.monotonic()
 
     # Step 1: Kill existing OpenOCD
@@ -102,6 +111,9 @@ def reset_and_observe(with_rtt: bool = False, boot_wait: int = 3,
     subprocess.run(["pkill", "-f", "openocd"], capture_output=True)
     time.sleep(1)
 
+    if with_rtt:
+        return _reset_with_rtt(boot_wait, start_time, verbose)
+
     # Step 2: Reset target (one-shot OpenOCD)
     if verbose:
         print("  [2/4] Resetting target via SWD...", file=sys.stderr)
@@ -114,76 +126,126 @@ def reset_and_observe(with_rtt: bool = False, boot_wait: int = 3,
         print(f"  [3/4] Waiting {boot_wait}s for boot...", file=sys.stderr)
     time.sleep(boot_wait)
 
-    # Step 4: Optionally start RTT server
-    if with_rtt:
-        if verbose:
-            print("  [4/4] Starting OpenOCD with RTT...", file=sys.stderr)
+    if verbose:
+        print("  [4/4] No RTT requested, done.", file=sys.stderr)
 
-        try:
-            project_root = find_project_root()
-        except FileNotFoundError as e:
-            return {
-                "status": "error",
-                "tool": "reset.py",
-                "error": str(e),
-                "duration_ms": int((time.monotonic() - start_time) * 1000),
-            }
+    duration_ms = int((time.monotonic() - start_time) * 1000)
 
-        probe_cfg = os.path.join(project_root, DEFAULT_PROBE_CFG)
-        rtt_cfg = os.path.join(project_root, DEFAULT_RTT_CFG)
+    return {
+        "status": "success",
+        "tool": "reset.py",
+        "reset": reset_result,
+        "duration_ms": duration_ms,
+    }
 
-        try:
-            _openocd_proc = start_openocd_server(
-                probe_cfg=probe_cfg,
-                extra_cfgs=[rtt_cfg],
-                post_init_cmds=[
-                    "rtt start",
-                    "rtt server start 9090 0",
-                    "rtt server start 9091 1",
-                    "rtt server start 9092 2",
-                ],
-            )
-
-            if not wait_for_openocd_ready(TCL_RPC_PORT, timeout=10):
+
+# Reset, resume and report the target state in one TCL RPC round trip.
+# OpenOCD returns command failures (lost target, failed reset init) as
+# response text rather than as an RPC error, so they are caught here and
+# answered with "error: ..." instead of the state.
+_RESET_RESUME_SCRIPT = (
+    'if {[catch {reset init; resume} err]} {set err "error: $err"} '
+    'else {[target current] curstate}'
+)
+
+
+def _reset_with_rtt(boot_wait: int, start_time: float, verbose: bool) -> dict:
+    """Reset over TCL RPC on a persistent OpenOCD, then start RTT servers.
+
+    Args:
+        boot_wait: Seconds to wait for firmware boot before starting RTT.
+        start_time: time.monotonic() at the start of reset_and_observe.
+        verbose: Print progress.
+
+    Returns:
+        dict with reset status and details.
+    """
+    global _openocd_proc
+
+    try:
+        project_root = find_project_root()
+    except FileNotFoundError as e:
+        return {
+            "status": "error",
+            "tool": "reset.py",
+            "error": str(e),
+            "duration_ms": int((time.monotonic() - start_time) * 1000),
+        }
+
+    probe_cfg = os.path.join(project_root, DEFAULT_PROBE_CFG)
+    rtt_cfg = os.path.join(project_root, DEFAULT_RTT_CFG)
+
+    # Step 2: Start the persistent server and reset through it
+    if verbose:
+        print("  [2/4] Starting OpenOCD and resetting target via TCL RPC...",
+              file=sys.stderr)
+    try:
+        _openocd_proc = start_openocd_server(
+            probe_cfg=probe_cfg,
+            extra_cfgs=[rtt_cfg],
+        )
+    except Exception as e:
+        return {
+            "status": "error",
+            "tool": "reset.py",
+            "error": f"Failed to start OpenOCD: {e}",
+            "duration_ms": int((time.monotonic() - start_time) * 1000),
+        }
+
+    if not wait_for_openocd_ready(TCL_RPC_PORT, timeout=10):
+        return {
+            "status": "error",
+            "tool": "reset.py",
+            "error": "OpenOCD did not become ready within 10s",
+            "duration_ms": int((time.monotonic() - start_time) * 1000),
+        }
+
+    try:
+        reset_start = time.monotonic()
+        with OpenOCDTclClient(port=TCL_RPC_PORT) as client:
+            state = client.send(_RESET_RESUME_SCRIPT)
+            if state != "running":
                 return {
                     "status": "error",
                     "tool": "reset.py",
-                    "error": "OpenOCD did not become ready within 10s",
+                    "error": f"TCL RPC reset failed: {state or 'no response'}",
                     "duration_ms": int((time.monotonic() - start_time) * 1000),
                 }
-
-            # Wait for RTT control block discovery
-            if verbose:
-                print("  [4.5/4] Waiting for RTT control block...", file=sys.stderr)
-            rtt_status = wait_for_rtt_ready(timeout=10, verbose=verbose)
-            if not rtt_status["ready"]:
-                # Fallback: give it 2 more seconds
-                if verbose:
-                    print("  RTT polling timeout, using fallback sleep...", file=sys.stderr)
-                time.sleep(2)
-
-            duration_ms = int((time.monotonic() - start_time) * 1000)
-
-            return {
+            reset_result = {
                 "status": "success",
                 "tool": "reset.py",
-                "reset": reset_result,
-                "openocd_pid": _openocd_proc.pid,
-                "rtt_ports": {"ch0": 9090, "ch1": 9091, "ch2": 9092},
-                "duration_ms": duration_ms,
-                "note": f"OpenOCD running with PID {_openocd_proc.pid}. "
-                        f"Kill with: kill {_openocd_proc.pid} or pkill openocd",
+                "operation": "reset",
+                "method": "tcl_rpc",
+                "duration_ms": int((time.monotonic() - reset_start) * 1000),
+                "error": None,
             }
-        except Exception as e:
-            return {
-                "status": "error",
-                "tool": "reset.py",
-                "error": f"Failed to start OpenOCD: {e}",
-                "duration_ms": int((time.monotonic() - start_time) * 1000),
-            }
-    else:
+
+            # Step 3: Wait for boot (RTT control block is set up by firmware)
+            if verbose:
+                print(f"  [3/4] Waiting {boot_wait}s for boot...", file=sys.stderr)
+            time.sleep(boot_wait)
+
+            # Step 4: Start RTT and all channel servers in one round trip
+            if verbose:
+                print("  [4/4] Starting RTT servers...", file=sys.stderr)
+            client.send_batch(RTT_START_CMDS)
+    except Exception as e:
+        return {
+            "status": "error",
+            "tool": "reset.py",
+            "error": f"TCL RPC reset failed: {e}",
+            "duration_ms": int((time.monotonic() - start_time) * 1000),
+        }
+
+    # Wait for RTT control block discovery
+    if verbose:
+        print("  [4.5/4] Waiting for RTT control block...", file=sys.stderr)
+    rtt_status = wait_for_rtt_ready(timeout=10, verbose=verbose)
+    if not rtt_status["ready"]:
+        # Fallback: give it 2 more seconds
         if verbose:
-            print("  [4/4] No RTT requested, done.", file=sys.stderr)
+            print("  RTT polling timeout, using fallback sleep...", file=sys.stderr)
+        time.sleep(2)
 
     duration_ms = int((time.monotonic() - start_time) * 1000)
 
@@ -191,7 +253,11 @@ def reset_and_observe(with_rtt: bool = False, boot_wait: int = 3,
         "status": "success",
         "tool": "reset.py",
         "reset": reset_result,
+        "openocd_pid": _openocd_proc.pid,
+        "rtt_ports": dict(RTT_PORTS),
         "duration_ms": duration_ms,
+        "note": f"OpenOCD running with PID {_openocd_proc.pid}. "
+                f"Kill with: kill {_openocd_proc.pid} or pkill openocd",
     }
 
 
@@ -216,9 +282,9 @@ Examples:
 
 Workflow:
     1. Kill any existing OpenOCD instance
-    2. Send one-shot reset command via SWD
+    2. Reset via SWD (one-shot OpenOCD, or TCL RPC on the server with --with-rtt)
     3. Wait for firmware boot (~5 seconds)
-    4. [Optional] Start OpenOCD with RTT on ports 9090/9091/9092
+    4. [Optional] Start RTT servers on ports 9090/9091/9092
 
 Note: This is faster than reflashing (~6s saved) and preserves LittleFS config.
 """,
@@ -251,7 +317,7 @@ Note: This is faster than reflashing (~6s saved) and preserves LittleFS config.
         pf = preflight_check(verbose=args.verbose)
         if pf["status"] != "pass":
             if args.json:
-                print(json.dumps(pf, indent=2))
+                print(dumps_json(pf))
             else:
                 print(f"✗ Pre-flight failed:")
                 for name, check in pf.get("checks", {}).items():
@@ -279,7 +345,7 @@ Note: This is faster than reflashing (~6s saved) and preserves LittleFS config.
 
     # Output
     if args.json:
-        print(json.dumps(result, indent=2))
+        print(dumps_json(result))
     else:
         if result["status"] == "success":
             print(f"✓ Target reset successfully")
@@ -20,23 +20,39 @@ Usage:
 """
 
 import argparse
-import json
+import functools
+import itertools
 import os
-import re
 import shutil
 import sys
 import time
 
 # Allow running from project root or tools/hil/
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from openocd_utils import DEFAULT_ELF_PATH, GDB_PORT, find_project_root
+from openocd_utils import DEFAULT_ELF_PATH, GDB_PORT, dumps_json, find_project_root
+
+try:
+    from pygdbmi.gdbcontroller import GdbController
+except ImportError:  # Reported as a structured error by run_hardware_test()
+    GdbController = None
 
 
 # ===========================================================================
-# SIO Register Addresses (for monitor command reads)
+# SIO Register Addresses (read via -data-read-memory-bytes)
 # ===========================================================================
 
 SIO_GPIO_IN = 0xD0000004
+SIO_CPUID = 0xD0000000
+
+
+# ===========================================================================
+# GDB MI Timing
+# ===========================================================================
+
+# Length of a single pygdbmi read while waiting for MI records. With
+# time_to_check_for_additional_output_sec=0.0 a read does not end early when
+# output arrives, so this also bounds how late a reply is noticed.
+MI_POLL_INTERVAL = 0.05
 
 
 # ===========================================================================
@@ -52,21 +68,32 @@ def find_gdb() -> str:
         3. shutil.which('arm-none-eabi-gdb')
         4. Raise FileNotFoundError
 
+    The lookup is cached per ($GDB_PATH, $PATH) pair, so repeated calls
+    skip the PATH walk until either variable changes.
+
     Returns:
         Absolute path to GDB executable.
     """
+    return _find_gdb_cached(
+        os.environ.get("GDB_PATH", ""),
+        os.environ.get("PATH"),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _find_gdb_cached(env_gdb: str, search_path: str) -> str:
+    """Uncached GDB lookup behind find_gdb(); arguments form the cache key."""
     # 1. Environment variable
-    env_gdb = os.environ.get("GDB_PATH")
     if env_gdb and os.path.isfile(env_gdb) and os.access(env_gdb, os.X_OK):
         return os.path.abspath(env_gdb)
 
     # 2. gdb-multiarch (preferred on Ubuntu/Debian)
-    gdb = shutil.which("gdb-multiarch")
+    gdb = shutil.which("gdb-multiarch", path=search_path)
     if gdb:
         return os.path.abspath(gdb)
 
     # 3. arm-none-eabi-gdb (ARM toolchain)
-    gdb = shutil.which("arm-none-eabi-gdb")
+    gdb = shutil.which("arm-none-eabi-gdb", path=search_path)
     if gdb:
         return os.path.abspath(gdb)
 
@@ -81,124 +108,254 @@ def find_gdb() -> str:
 
 
 # ===========================================================================
-# GDB Test Runner
+# MI Result Parsing
 # ===========================================================================
 
-def run_hardware_test(elf_path: str, gdb_path: str = None,
-                      host: str = "localhost", port: int = GDB_PORT,
-                      breakpoint: str = "main", timeout: int = 10,
-                      verbose: bool = False) -> dict:
-    """Run a minimal hardware test via GDB Machine Interface.
+# *stopped reasons that count as "the breakpoint was reached"
+_STOP_REASONS = frozenset({"breakpoint-hit", "end-stepping-range"})
 
-    Connects GDB to OpenOCD, sets a breakpoint, reads registers and SIO
-    state, and returns the results as structured JSON.
+# -data-list-register-values register number → result key
+_REG_NAMES = {"15": "pc", "13": "sp", "14": "lr"}
 
-    Args:
-        elf_path: Path to .elf file (for symbol resolution).
-        gdb_path: Path to GDB binary (auto-detected if None).
-        host: OpenOCD GDB server host.
-        port: OpenOCD GDB server port (default: 3333).
-        breakpoint: Symbol name to break at (default: 'main').
-        timeout: Maximum wait time for breakpoint hit in seconds.
-        verbose: Include raw GDB output in result.
+
+def _result_payload(responses: list, message: str = "done"):
+    """Return the payload of the result record with the given class.
 
     Returns:
-        dict with test results.
+        The payload dict (empty if GDB sent none), or None if no result
+        record of that class is present.
     """
-    start_time = time.monotonic()
+    for r in responses:
+        if r.get("type") == "result" and r.get("message") == message:
+            return r.get("payload") or {}
+    return None
 
-    # Validate ELF
-    if not os.path.isfile(elf_path):
-        return {
-            "status": "error",
-            "tool": "run_hw_test.py",
-            "elf": elf_path,
-            "error": f"ELF file not found: {elf_path}",
-            "duration_ms": int((time.monotonic() - start_time) * 1000),
-        }
 
-    # Find GDB
-    try:
-        if gdb_path is None:
-            gdb_path = find_gdb()
-    except FileNotFoundError as e:
-        return {
-            "status": "error",
-            "tool": "run_hw_test.py",
-            "elf": elf_path,
-            "error": str(e).split("\n")[0],
-            "duration_ms": int((time.monotonic() - start_time) * 1000),
-        }
+def _read_word_result(responses: list):
+    """Extract a 32-bit word from a -data-read-memory-bytes reply.
 
-    # Import pygdbmi
+    The payload carries the bytes as a hex string in target order, which is
+    little-endian on RP2040.
+
+    Returns:
+        The word as an int, or None if the read failed.
+    """
+    payload = _result_payload(responses)
+    memory = payload.get("memory") if payload else None
+    if not memory:
+        return None
     try:
-        from pygdbmi.gdbcontroller import GdbController
-    except ImportError:
-        return {
-            "status": "error",
-            "tool": "run_hw_test.py",
-            "elf": elf_path,
-            "error": "pygdbmi not installed. Run: pip install pygdbmi",
-            "duration_ms": int((time.monotonic() - start_time) * 1000),
-        }
+        contents = bytes.fromhex(memory[0].get("contents", ""))
+    except ValueError:
+        return None
+    return int.from_bytes(contents, "little")
 
-    elf_abs = os.path.abspath(elf_path)
-    gdb_output_log = []
 
-    try:
-        # Start GDB with MI interface
-        gdbmi = GdbController(
-            command=[gdb_path, "--interpreter=mi3", "-q"],
-            time_to_check_for_additional_output_sec=0.5,
-        )
+# ===========================================================================
+# GDB Test Session
+# ===========================================================================
 
-        def _write_and_collect(cmd: str, timeout_sec: float = 5.0) -> list:
-            """Send GDB MI command and collect responses."""
-            responses = gdbmi.write(cmd, timeout_sec=timeout_sec)
-            if verbose:
-                gdb_output_log.extend(responses)
-            return responses
+class HardwareTestSession:
+    """One GDB/MI connection to OpenOCD, reusable for several inspections.
 
-        # Load ELF for symbols
-        _write_and_collect(f"-file-exec-and-symbols {elf_abs}")
+    Spawning GDB and loading symbols dominates a single test run, so callers
+    that inspect the target repeatedly (CI retries, orchestrators) should
+    open one session and call inspect() as often as needed.
 
-        # Connect to OpenOCD GDB server
-        connect_responses = _write_and_collect(
-            f"-target-select remote {host}:{port}", timeout_sec=10.0
-        )
+    Usage:
+        with HardwareTestSession("build/firmware/app/firmware.elf") as s:
+            first = s.inspect(breakpoint="vTaskDelay")
+            second = s.inspect(breakpoint="vTaskDelay")
+
+    The target is left halted between inspections; close() resumes it and
+    detaches.
 
-        # Check connection success
-        connected = any(
-            r.get("message") == "connected" or
-            r.get("type") == "result" and r.get("payload", {}).get("msg", "").startswith("Remote")
-            for r in connect_responses
+    Raises (from open() / __enter__):
+        FileNotFoundError: GDB binary not found.
+        ImportError: pygdbmi not installed.
+        ConnectionError: GDB could not connect to the OpenOCD GDB server.
+    """
+
+    def __init__(self, elf_path: str, gdb_path: str = None,
+                 host: str = "localhost", port: int = GDB_PORT,
+                 verbose: bool = False):
+        self.elf_path = elf_path
+        self.gdb_path = gdb_path
+        self.host = host
+        self.port = port
+        self.verbose = verbose
+        self._gdbmi = None
+        self._tokens = itertools.count(10)
+        self._log = []
+        # Untokened records read after the last batch's results (e.g. a
+        # *stopped arriving with ^running); consumed by _wait_for_stop()
+        self._async_records = []
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # -- MI transport ------------------------------------------------------
+
+    def _write_batch(self, cmds: list, timeout_sec: float = 5.0) -> list:
+        """Send several MI commands in one write and demultiplex replies.
+
+        Each command gets a numeric token prefix. GDB executes them in
+        order, so untokened stream output (console/target/log records)
+        belongs to the oldest command still awaiting its result record.
+        Untokened records that arrive once every result is in are kept in
+        _async_records instead of being dropped.
+
+        Returns:
+            One response list per command, in the order given.
+        """
+        batch_tokens = [next(self._tokens) for _ in cmds]
+        by_token = {tok: [] for tok in batch_tokens}
+        pending = list(batch_tokens)
+        self._async_records.clear()  # Older events predate these commands
+        self._gdbmi.write(
+            "\n".join(f"{tok}{cmd}" for tok, cmd in zip(batch_tokens, cmds)),
+            read_response=False,
         )
-        if not connected:
-            # Check if any result response indicates success
-            connected = any(
-                r.get("message") == "connected" or
-                (r.get("type") == "result" and r.get("message") == "done")
-                for r in connect_responses
+        deadline = time.monotonic() + timeout_sec
+        while pending and time.monotonic() < deadline:
+            responses = self._gdbmi.get_gdb_response(
+                timeout_sec=min(MI_POLL_INTERVAL,
+                                max(0.0, deadline - time.monotonic())),
+                raise_error_on_timeout=False,
             )
+            if self.verbose:
+                self._log.extend(responses)
+            for r in responses:
+                tok = r.get("token")
+                is_result = r.get("type") == "result"
+                if tok not in by_token:
+                    if is_result:
+                        continue
+                    if not pending:
+                        self._async_records.append(r)
+                        continue
+                    tok = pending[0]
+                by_token[tok].append(r)
+                if is_result and tok in pending:
+                    pending.remove(tok)
+        return [by_token[tok] for tok in batch_tokens]
+
+    def _write_and_collect(self, cmd: str, timeout_sec: float = 5.0) -> list:
+        """Send one GDB MI command and return once its result arrives."""
+        return self._write_batch([cmd], timeout_sec)[0]
+
+    def _wait_for_stop(self, timeout_sec: float, reasons: tuple = None) -> bool:
+        """Wait for a *stopped notification, optionally with a given reason.
+
+        Returns:
+            True if a matching stop was seen before the timeout.
+        """
+        # Read in short slices (see MI_POLL_INTERVAL): a read lasts its full
+        # timeout, so one long read would always wait out the deadline.
+        # Records left over from the last batch come first: GDB often sends
+        # *stopped in the same read as the ^running of -exec-continue.
+        responses = self._async_records
+        self._async_records = []
+        deadline = time.monotonic() + timeout_sec
+        while True:
+            for r in responses:
+                if r.get("message") != "stopped" or r.get("type") != "notify":
+                    continue
+                if reasons is None or (r.get("payload") or {}).get("reason") in reasons:
+                    return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            responses = self._gdbmi.get_gdb_response(
+                timeout_sec=min(MI_POLL_INTERVAL, remaining),
+                raise_error_on_timeout=False,
+            )
+            if self.verbose:
+                self._log.extend(responses)
+
+    # -- Lifecycle ---------------------------------------------------------
+
+    def open(self) -> None:
+        """Spawn GDB, load the ELF symbols and connect to OpenOCD."""
+        if self.gdb_path is None:
+            self.gdb_path = find_gdb()
+
+        if GdbController is None:
+            raise ImportError("pygdbmi not installed")
+
+        # Start GDB with MI interface. Replies are matched by token (see
+        # _write_batch), so pygdbmi need not linger for trailing output.
+        self._gdbmi = GdbController(
+            command=[self.gdb_path, "--interpreter=mi3", "-q"],
+            time_to_check_for_additional_output_sec=0.0,
+        )
+
+        # Load ELF for symbols and connect to the OpenOCD GDB server in one
+        # write; GDB runs them in order, so symbols are loaded before connect.
+        elf_abs = self.elf_path
+        if not os.path.isabs(elf_abs):
+            elf_abs = os.path.abspath(elf_abs)
+        _, connect_responses = self._write_batch([
+            f"-file-exec-and-symbols {elf_abs}",
+            f"-target-select remote {self.host}:{self.port}",
+        ], timeout_sec=15.0)
+
+        # Check connection success (^connected, or ^done on some GDB builds)
+        results = [
+            (r.get("message"), r.get("payload") or {})
+            for r in connect_responses if r.get("type") == "result"
+        ]
+        connected = any(msg in ("connected", "done") for msg, _ in results)
 
         if not connected:
             error_msgs = [
-                r.get("payload", {}).get("msg", "")
-                for r in connect_responses
-                if r.get("type") == "result" and r.get("message") == "error"
+                payload.get("msg", "") for msg, payload in results if msg == "error"
             ]
-            error_text = "; ".join(error_msgs) if error_msgs else "Connection failed"
-            return {
-                "status": "error",
-                "tool": "run_hw_test.py",
-                "elf": elf_path,
-                "error": f"Cannot connect GDB to {host}:{port}: {error_text}",
-                "suggestions": [
-                    "Ensure OpenOCD is running as a persistent server",
-                    f"Verify GDB port {port} is open: nc -z {host} {port}",
-                ],
-                "duration_ms": int((time.monotonic() - start_time) * 1000),
-            }
+            self._exit_gdb()
+            raise ConnectionError(
+                "; ".join(error_msgs) if error_msgs else "Connection failed"
+            )
+
+    def close(self) -> None:
+        """Resume the target, detach and terminate GDB."""
+        if self._gdbmi is None:
+            return
+        try:
+            self._write_and_collect("-exec-continue", timeout_sec=1.0)
+        except Exception:
+            pass
+        try:
+            self._write_and_collect("-target-detach", timeout_sec=2.0)
+        except Exception:
+            pass
+        self._exit_gdb()
+
+    def _exit_gdb(self) -> None:
+        try:
+            self._gdbmi.exit()
+        except Exception:
+            pass
+        self._gdbmi = None
+
+    # -- Inspection --------------------------------------------------------
+
+    def inspect(self, breakpoint: str = "main", timeout: int = 10) -> dict:
+        """Halt the target, read its state and optionally wait for a breakpoint.
+
+        Args:
+            breakpoint: Symbol name to break at (default: 'main').
+            timeout: Maximum wait time for breakpoint hit in seconds.
+
+        Returns:
+            dict with test results. With verbose=True, "gdb_log" holds the
+            MI records received since the previous inspection (or connect).
+        """
+        start_time = time.monotonic()
 
         # ---------------------------------------------------------------
         # RP2040 test strategy
@@ -219,21 +376,29 @@ def run_hardware_test(elf_path: str, gdb_path: str = None,
         # ---------------------------------------------------------------
 
         # Phase 1: halt & inspect
-        _write_and_collect("monitor halt", timeout_sec=5.0)
-        time.sleep(0.2)
-
-        # Read registers (PC, SP, LR)
+        #
+        # OpenOCD's "halt" only returns once the core has halted (or its own
+        # timeout expired), and GDB runs a batch strictly in order, so the
+        # halt is simply the first command of the batch; no settle delay is
+        # needed.  The reads (and the Phase 2 breakpoint insert) have no
+        # data dependency on each other: one write, one drain, instead of
+        # a request/response round trip each.
+        _, reg_responses, sio_responses, core_responses, bp_responses = self._write_batch([
+            "monitor halt",
+            "-data-list-register-values x 15 13 14",
+            f"-data-read-memory-bytes 0x{SIO_GPIO_IN:08x} 4",
+            f"-data-read-memory-bytes 0x{SIO_CPUID:08x} 4",
+            f"-break-insert -h {breakpoint}",
+        ], timeout_sec=13.0)
+
+        # Registers (PC, SP, LR)
         registers = {}
-        reg_responses = _write_and_collect("-data-list-register-values x 15 13 14")
-        for r in reg_responses:
-            if r.get("type") == "result" and r.get("message") == "done":
-                reg_values = r.get("payload", {}).get("register-values", [])
-                reg_map = {"15": "pc", "13": "sp", "14": "lr"}
-                for rv in reg_values:
-                    num = rv.get("number", "")
-                    val = rv.get("value", "0x0")
-                    if num in reg_map:
-                        registers[reg_map[num]] = val
+        reg_payload = _result_payload(reg_responses)
+        if reg_payload:
+            for rv in reg_payload.get("register-values", []):
+                name = _REG_NAMES.get(rv.get("number", ""))
+                if name:
+                    registers[name] = rv.get("value", "0x0")
 
         # Verify PC is in flash (0x1000_0000) or SRAM (0x2000_0000)
         pc_val = registers.get("pc", "0x0")
@@ -245,76 +410,24 @@ def run_hardware_test(elf_path: str, gdb_path: str = None,
         in_sram = 0x20000000 <= pc_int < 0x20042000
         firmware_running = in_flash or in_sram
 
-        # Read SIO GPIO register
-        sio_responses = _write_and_collect(
-            f"monitor mdw 0x{SIO_GPIO_IN:08x}", timeout_sec=3.0
-        )
-        sio_gpio_in = "unknown"
-        for r in sio_responses:
-            payload = r.get("payload", "")
-            if isinstance(payload, str):
-                match = re.search(r":\s*([0-9a-fA-F]+)", payload)
-                if match:
-                    sio_gpio_in = f"0x{match.group(1)}"
-
-        # Read current core number
-        core_responses = _write_and_collect(
-            f"monitor mdw 0x{0xD0000000:08x}", timeout_sec=3.0
-        )
-        core_num = 0
-        for r in core_responses:
-            payload = r.get("payload", "")
-            if isinstance(payload, str):
-                match = re.search(r":\s*([0-9a-fA-F]+)", payload)
-                if match:
-                    core_num = int(match.group(1), 16)
-
-        # Phase 2: breakpoint test (set, continue, wait)
-        breakpoint_hit = False
-        bp_responses = _write_and_collect(f"-break-insert -h {breakpoint}")
-        bp_set = any(
-            r.get("type") == "result" and r.get("message") == "done"
-            for r in bp_responses
-        )
+        sio_word = _read_word_result(sio_responses)
+        sio_gpio_in = "unknown" if sio_word is None else f"0x{sio_word:08x}"
+        core_num = _read_word_result(core_responses) or 0
 
-        if bp_set:
-            _write_and_collect("-exec-continue", timeout_sec=2.0)
-
-            def _check_bp_hit(responses):
-                """Check if any response indicates a breakpoint hit."""
-                for r in responses:
-                    if (r.get("type") == "notify" and
-                            r.get("message") == "stopped" and
-                            r.get("payload", {}).get("reason") in
-                            ("breakpoint-hit", "end-stepping-range")):
-                        return True
-                return False
-
-            deadline = time.monotonic() + timeout
-            while time.monotonic() < deadline:
-                try:
-                    responses = gdbmi.get_gdb_response(timeout_sec=1.0)
-                    if verbose:
-                        gdb_output_log.extend(responses)
-                    if _check_bp_hit(responses):
-                        breakpoint_hit = True
-                        break
-                except Exception:
-                    continue
-
-        # Clean up: resume target and detach
-        try:
-            _write_and_collect("-exec-continue", timeout_sec=1.0)
-        except Exception:
-            pass
-        try:
-            _write_and_collect("-target-detach", timeout_sec=2.0)
-        except Exception:
-            pass
-        try:
-            gdbmi.exit()
-        except Exception:
-            pass
+        # Phase 2: breakpoint test (continue, wait)
+        breakpoint_hit = False
+        bp_payload = _result_payload(bp_responses)
+        bp_number = bp_payload.get("bkpt", {}).get("number") if bp_payload else None
+
+        if bp_number is not None:
+            self._write_and_collect("-exec-continue", timeout_sec=2.0)
+            breakpoint_hit = self._wait_for_stop(timeout, reasons=_STOP_REASONS)
+            if not breakpoint_hit:
+                # Halt again so the session stays in a known state.
+                self._write_and_collect("-exec-interrupt", timeout_sec=2.0)
+                self._wait_for_stop(2.0)
+            # Drop the breakpoint so the next inspection starts clean.
+            self._write_and_collect(f"-break-delete {bp_number}")
 
         duration_ms = int((time.monotonic() - start_time) * 1000)
 
@@ -325,7 +438,7 @@ def run_hardware_test(elf_path: str, gdb_path: str = None,
             result = {
                 "status": "success",
                 "tool": "run_hw_test.py",
-                "elf": elf_path,
+                "elf": self.elf_path,
                 "firmware_running": True,
                 "pc_region": "flash" if in_flash else "sram",
                 "breakpoint": breakpoint,
@@ -340,7 +453,7 @@ def run_hardware_test(elf_path: str, gdb_path: str = None,
             result = {
                 "status": "error",
                 "tool": "run_hw_test.py",
-                "elf": elf_path,
+                "elf": self.elf_path,
                 "firmware_running": False,
                 "registers": registers,
                 "error": (f"PC ({pc_val}) not in flash/SRAM region — "
@@ -348,25 +461,82 @@ def run_hardware_test(elf_path: str, gdb_path: str = None,
                 "duration_ms": duration_ms,
             }
 
-        if verbose:
+        if self.verbose:
             result["gdb_log"] = [
                 {"type": r.get("type"), "message": r.get("message"),
                  "payload": str(r.get("payload", ""))[:200]}
-                for r in gdb_output_log
+                for r in self._log
             ]
+            self._log = []
 
         return result
 
-    except Exception as e:
-        duration_ms = int((time.monotonic() - start_time) * 1000)
+
+# ===========================================================================
+# GDB Test Runner
+# ===========================================================================
+
+def run_hardware_test(elf_path: str, gdb_path: str = None,
+                      host: str = "localhost", port: int = GDB_PORT,
+                      breakpoint: str = "main", timeout: int = 10,
+                      verbose: bool = False) -> dict:
+    """Run a minimal hardware test via GDB Machine Interface.
+
+    Connects GDB to OpenOCD, sets a breakpoint, reads registers and SIO
+    state, and returns the results as structured JSON. This opens and
+    closes a HardwareTestSession for a single inspection.
+
+    Args:
+        elf_path: Path to .elf file (for symbol resolution).
+        gdb_path: Path to GDB binary (auto-detected if None).
+        host: OpenOCD GDB server host.
+        port: OpenOCD GDB server port (default: 3333).
+        breakpoint: Symbol name to break at (default: 'main').
+        timeout: Maximum wait time for breakpoint hit in seconds.
+        verbose: Include raw GDB output in result.
+
+    Returns:
+        dict with test results.
+    """
+    start_time = time.monotonic()
+
+    def _error(message: str, **extra) -> dict:
         return {
             "status": "error",
             "tool": "run_hw_test.py",
             "elf": elf_path,
-            "error": f"GDB error: {e}",
-            "duration_ms": duration_ms,
+            "error": message,
+            **extra,
+            "duration_ms": int((time.monotonic() - start_time) * 1000),
         }
 
+    # Validate ELF
+    if not os.path.isfile(elf_path):
+        return _error(f"ELF file not found: {elf_path}")
+
+    try:
+        with HardwareTestSession(elf_path, gdb_path=gdb_path, host=host,
+                                 port=port, verbose=verbose) as session:
+            result = session.inspect(breakpoint=breakpoint, timeout=timeout)
+    except FileNotFoundError as e:
+        return _error(str(e).split("\n")[0])
+    except ImportError:
+        return _error("pygdbmi not installed. Run: pip install pygdbmi")
+    except ConnectionError as e:
+        return _error(
+            f"Cannot connect GDB to {host}:{port}: {e}",
+            suggestions=[
+                "Ensure OpenOCD is running as a persistent server",
+                f"Verify GDB port {port} is open: nc -z {host} {port}",
+            ],
+        )
+    except Exception as e:
+        return _error(f"GDB error: {e}")
+
+    # Report the whole run, including GDB startup and teardown.
+    result["duration_ms"] = int((time.monotonic() - start_time) * 1000)
+    return result
+
 
 # ===========================================================================
 # CLI Interface
@@ -436,16 +606,20 @@ Prerequisites:
 
     args = parser.parse_args()
 
-    # Resolve ELF path
+    # Resolve ELF path. Absolute paths and paths valid from the current
+    # directory (the documented "run from project root" case) are used as
+    # is; only otherwise is the project root discovered.
     elf_path = args.elf
     if not os.path.isabs(elf_path):
-        try:
-            project_root = find_project_root()
-            candidate = os.path.join(project_root, elf_path)
-            if os.path.exists(candidate):
-                elf_path = candidate
-        except FileNotFoundError:
-            pass
+        if os.path.isfile(elf_path):
+            elf_path = os.path.abspath(elf_path)
+        else:
+            try:
+                candidate = os.path.join(find_project_root(), elf_path)
+                if os.path.exists(candidate):
+                    elf_path = candidate
+            except FileNotFoundError:
+                pass
 
     # Run test
     result = run_hardware_test(
@@ -460,7 +634,7 @@ Prerequisites:
 
     # Output
     if args.json:
-        print(json.dumps(result, indent=2))
+        print(dumps_json(result))
     else:
         status_icon = "✓" if result.get("status") == "success" else "✗"
         print(f"{status_icon} Hardware test: {result.get('status', 'unknown')}")
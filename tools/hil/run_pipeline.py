@@ -16,12 +16,17 @@ Usage:
 
 import argparse
 import atexit
+import collections
+import concurrent.futures
+import functools
 import json
 import os
+import selectors
 import signal
 import socket
 import subprocess
 import sys
+import threading
 import time
 
 # Allow running from project root or tools/hil/
@@ -30,13 +35,17 @@ from openocd_utils import (
     DEFAULT_ELF_PATH,
     DEFAULT_PROBE_CFG,
     DEFAULT_RTT_CFG,
+    RTT_PORTS,
+    RTT_START_CMDS,
     find_openocd,
     find_openocd_scripts,
     find_project_root,
     is_openocd_running,
+    loads_json,
     start_openocd_server,
     wait_for_openocd_ready,
     wait_for_rtt_ready,
+    wait_process,
     TCL_RPC_PORT,
 )
 
@@ -54,7 +63,7 @@ def _cleanup():
     if _openocd_proc is not None:
         try:
             _openocd_proc.terminate()
-            _openocd_proc.wait(timeout=5)
+            wait_process(_openocd_proc, 5)
         except Exception:
             try:
                 _openocd_proc.kill()
@@ -79,49 +88,68 @@ signal.signal(signal.SIGTERM, _signal_handler)
 # Pipeline Stages
 # ===========================================================================
 
-def stage_build(project_root: str, verbose: bool = False) -> dict:
-    """Build firmware using Docker.
+# Lines of build output kept for the failure report (non-verbose builds)
+BUILD_LOG_TAIL_LINES = 200
 
-    Runs the hermetic Docker build container.
 
-    Args:
-        project_root: Absolute path to the project root.
-        verbose: Print build output.
+@functools.lru_cache(maxsize=1)
+def _find_docker_compose():
+    """Detect the docker compose front-end, once per process.
+
+    Each probe shells out (~50-200 ms), so the answer is memoized for
+    back-to-back pipeline runs.
 
     Returns:
-        dict with stage result.
+        Command prefix tuple (("docker-compose",) or ("docker", "compose")),
+        or None if neither is available.
     """
-    start = time.monotonic()
-
-    # Check if docker/docker-compose is available
-    docker_compose = None
     for cmd in ["docker-compose", "docker"]:
         if cmd == "docker":
             # Try "docker compose" (v2 plugin)
             try:
                 subprocess.run(
                     ["docker", "compose", "version"],
-                    capture_output=True, timeout=5,
+                    stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL, timeout=5,
+                    close_fds=False,  # Skip the fd-closing loop; only inheritable fds pass
                 )
-                docker_compose = ["docker", "compose"]
-                break
+                return ("docker", "compose")
             except (FileNotFoundError, subprocess.TimeoutExpired):
                 continue
         else:
             try:
                 subprocess.run(
                     [cmd, "version"],
-                    capture_output=True, timeout=5,
+                    stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL, timeout=5,
+                    close_fds=False,  # Skip the fd-closing loop; only inheritable fds pass
                 )
-                docker_compose = [cmd]
-                break
+                return (cmd,)
             except (FileNotFoundError, subprocess.TimeoutExpired):
                 continue
+    return None
+
+
+def stage_build(project_root: str, verbose: bool = False) -> dict:
+    """Build firmware using Docker.
+
+    Runs the hermetic Docker build container.
+
+    Args:
+        project_root: Absolute path to the project root.
+        verbose: Print build output.
+
+    Returns:
+        dict with stage result.
+    """
+    start = time.monotonic()
+
+    docker_compose = _find_docker_compose()
 
     if docker_compose:
         # Use docker compose
         compose_file = os.path.join(project_root, "tools", "docker", "docker-compose.yml")
-        cmd = docker_compose + ["-f", compose_file, "run", "--rm", "build"]
+        cmd = list(docker_compose) + ["-f", compose_file, "run", "--rm", "build"]
     else:
         # Fallback: direct Docker run
         cmd = [
@@ -132,41 +160,66 @@ def stage_build(project_root: str, verbose: bool = False) -> dict:
             "cd /workspace && mkdir -p build && cd build && cmake .. -G Ninja && ninja",
         ]
 
+    # Non-verbose builds keep only the last BUILD_LOG_TAIL_LINES lines of
+    # combined output for the error report, so a long Docker build never
+    # accumulates its whole log in memory.
     try:
-        result = subprocess.run(
+        proc = subprocess.Popen(
             cmd,
-            capture_output=not verbose,
+            stdin=subprocess.DEVNULL,
+            stdout=None if verbose else subprocess.PIPE,
+            stderr=None if verbose else subprocess.STDOUT,
             text=True,
-            timeout=300,  # 5 minute build timeout
+            errors="replace",
             cwd=project_root,
+            close_fds=False,  # Skip the fd-closing loop; only inheritable fds pass
         )
-        duration_ms = int((time.monotonic() - start) * 1000)
+    except FileNotFoundError:
+        return {
+            "status": "error",
+            "duration_ms": int((time.monotonic() - start) * 1000),
+            "error": "Docker not found. Install Docker to use the build pipeline.",
+        }
 
-        if result.returncode == 0:
-            return {
-                "status": "success",
-                "duration_ms": duration_ms,
-            }
-        else:
-            stderr = result.stderr if hasattr(result, "stderr") and result.stderr else ""
-            return {
-                "status": "failure",
-                "duration_ms": duration_ms,
-                "error": f"Build failed (exit code {result.returncode})",
-                "stderr": stderr[:1000] if stderr else None,
-            }
-    except subprocess.TimeoutExpired:
+    # 5 minute build timeout, enforced by a timer so the output can be
+    # streamed without a read timeout.
+    timed_out = threading.Event()
+
+    def _stop_build():
+        timed_out.set()
+        proc.kill()
+
+    killer = threading.Timer(300, _stop_build)
+    killer.start()
+    tail = collections.deque(maxlen=BUILD_LOG_TAIL_LINES)
+    try:
+        if proc.stdout is not None:
+            for line in proc.stdout:
+                tail.append(line)
+            proc.stdout.close()
+        returncode = proc.wait()
+    finally:
+        killer.cancel()
+    duration_ms = int((time.monotonic() - start) * 1000)
+
+    if timed_out.is_set():
         return {
             "status": "timeout",
-            "duration_ms": int((time.monotonic() - start) * 1000),
+            "duration_ms": duration_ms,
             "error": "Build timed out after 300s",
         }
-    except FileNotFoundError:
+    if returncode == 0:
         return {
-            "status": "error",
-            "duration_ms": int((time.monotonic() - start) * 1000),
-            "error": "Docker not found. Install Docker to use the build pipeline.",
+            "status": "success",
+            "duration_ms": duration_ms,
         }
+    output = "".join(tail)
+    return {
+        "status": "failure",
+        "duration_ms": duration_ms,
+        "error": f"Build failed (exit code {returncode})",
+        "stderr": output[-1000:] if output else None,
+    }
 
 
 def stage_flash(project_root: str, elf_path: str, verbose: bool = False) -> dict:
@@ -188,10 +241,12 @@ def stage_flash(project_root: str, elf_path: str, verbose: bool = False) -> dict
     try:
         result = subprocess.run(
             cmd,
+            stdin=subprocess.DEVNULL,
             capture_output=True,
             text=True,
             timeout=60,
             cwd=project_root,
+            close_fds=False,  # Skip the fd-closing loop; only inheritable fds pass
         )
         duration_ms = int((time.monotonic() - start) * 1000)
 
@@ -216,8 +271,27 @@ def stage_flash(project_root: str, elf_path: str, verbose: bool = False) -> dict
         }
 
 
+def _connect_with_retry(port: int, attempts: int = 40,
+                        interval: float = 0.05) -> socket.socket:
+    """Connect to a local TCP port, retrying briefly while it comes up.
+
+    Each attempt uses a 100 ms connect timeout, so a port that is already
+    listening connects immediately and a missing one gives up after ~2 s.
+
+    Raises:
+        OSError: The last connect error if every attempt failed.
+    """
+    for attempt in range(attempts):
+        try:
+            return socket.create_connection(("localhost", port), timeout=0.1)
+        except OSError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(interval)
+
+
 def stage_rtt_capture(project_root: str, duration_secs: int = 5,
-                      verbose: bool = False) -> dict:
+                      verbose: bool = False, on_connected=None) -> dict:
     """Start OpenOCD with RTT and capture output.
 
     If OpenOCD is not already running, starts it with pico-probe.cfg + rtt.cfg.
@@ -227,6 +301,8 @@ def stage_rtt_capture(project_root: str, duration_secs: int = 5,
         project_root: Absolute path to the project root.
         duration_secs: How long to capture RTT data.
         verbose: Print capture progress.
+        on_connected: Optional callable, invoked with no arguments once the
+            RTT port accepts connections (just before capture starts).
 
     Returns:
         dict with stage result.
@@ -245,12 +321,7 @@ def stage_rtt_capture(project_root: str, duration_secs: int = 5,
             _openocd_proc = start_openocd_server(
                 probe_cfg=probe_cfg,
                 extra_cfgs=[rtt_cfg],
-                post_init_cmds=[
-                    "rtt start",
-                    "rtt server start 9090 0",
-                    "rtt server start 9091 1",
-                    "rtt server start 9092 2",
-                ],
+                post_init_cmds=RTT_START_CMDS,
             )
 
             if not wait_for_openocd_ready(TCL_RPC_PORT, timeout=10):
@@ -270,29 +341,46 @@ def stage_rtt_capture(project_root: str, duration_secs: int = 5,
     if verbose:
         print("  Waiting for RTT control block...", file=sys.stderr)
     rtt_status = wait_for_rtt_ready(timeout=10, verbose=verbose)
-    if not rtt_status.get("ready"):
-        # Fallback: brief delay even if polling failed
-        if verbose:
-            print("  RTT polling timeout, using fallback sleep...", file=sys.stderr)
-        time.sleep(2.0)
+    if not rtt_status.get("ready") and verbose:
+        # Not fatal: the connect below retries while the server comes up
+        print("  RTT polling timeout, trying the RTT port anyway...", file=sys.stderr)
 
     # Capture RTT binary data from port 9091
+    # Chunks are collected in a list: "bytes +=" recopies the whole buffer on
+    # every recv. Only the byte count is reported, so they are never joined.
     bytes_received = 0
-    rtt_data = b""
+    rtt_chunks: list[bytes] = []
     try:
-        sock = socket.create_connection(("localhost", 9091), timeout=5)
-        sock.settimeout(1.0)
-
+        sock = _connect_with_retry(RTT_PORTS["ch1"])
+        if on_connected is not None:
+            on_connected()
+        sock.setblocking(False)
+        sel = selectors.DefaultSelector()
+        sel.register(sock, selectors.EVENT_READ)
+
+        # Sleep in select() until data arrives, then drain everything that
+        # is buffered. The stage ends within ~50 ms of the deadline.
         capture_deadline = time.monotonic() + duration_secs
-        while time.monotonic() < capture_deadline:
-            try:
-                chunk = sock.recv(4096)
-                if chunk:
-                    rtt_data += chunk
-                    bytes_received += len(chunk)
-            except socket.timeout:
-                continue
-        sock.close()
+        peer_closed = False
+        try:
+            while not peer_closed:
+                remaining = capture_deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                for _key, _events in sel.select(timeout=min(0.05, remaining)):
+                    while True:
+                        try:
+                            chunk = sock.recv(65536)
+                        except BlockingIOError:
+                            break
+                        if not chunk:
+                            peer_closed = True
+                            break
+                        rtt_chunks.append(chunk)
+                        bytes_received += len(chunk)
+        finally:
+            sel.close()
+            sock.close()
     except (ConnectionRefusedError, OSError) as e:
         # RTT port might not be ready yet — not fatal
         if verbose:
@@ -308,14 +396,55 @@ def stage_rtt_capture(project_root: str, duration_secs: int = 5,
     }
 
 
+def _ensure_token_database(project_root: str) -> bool:
+    """Generate token_database.csv with gen_tokens.py if it is missing.
+
+    Independent of the target, so run_pipeline() can run it in the
+    background while the flash stage is busy.
+
+    Args:
+        project_root: Absolute path to the project root.
+
+    Returns:
+        True if the token database exists afterwards.
+    """
+    csv_path = os.path.join(project_root, "tools", "logging", "token_database.csv")
+    if os.path.isfile(csv_path):
+        return True
+
+    gen_script = os.path.join(project_root, "tools", "logging", "gen_tokens.py")
+    if os.path.isfile(gen_script):
+        try:
+            subprocess.run(
+                [sys.executable, gen_script,
+                 "--scan-dirs", os.path.join(project_root, "firmware"),
+                 "--csv", csv_path,
+                 "--header", os.path.join(project_root, "firmware", "components",
+                                           "logging", "include", "tokens_generated.h"),
+                 "--base-dir", project_root],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=30,
+                cwd=project_root,
+                close_fds=False,  # Skip the fd-closing loop; only inheritable fds pass
+            )
+        except Exception:
+            pass
+
+    return os.path.isfile(csv_path)
+
+
 def stage_rtt_decode(project_root: str, duration_secs: int = 5,
-                     verbose: bool = False) -> dict:
+                     verbose: bool = False, token_db_ready: bool = None) -> dict:
     """Decode RTT output using log_decoder.py.
 
     Args:
         project_root: Absolute path to the project root.
         duration_secs: How long to capture/decode.
         verbose: Print decode output.
+        token_db_ready: Result of an earlier _ensure_token_database() call,
+            so it is not run twice; None runs it here.
 
     Returns:
         dict with stage result.
@@ -332,85 +461,82 @@ def stage_rtt_decode(project_root: str, duration_secs: int = 5,
             "note": "log_decoder.py not found — skipping RTT decode",
         }
 
-    if not os.path.isfile(csv_path):
-        # Try to generate token database
-        gen_script = os.path.join(project_root, "tools", "logging", "gen_tokens.py")
-        if os.path.isfile(gen_script):
-            try:
-                subprocess.run(
-                    [sys.executable, gen_script,
-                     "--scan-dirs", os.path.join(project_root, "firmware"),
-                     "--csv", csv_path,
-                     "--header", os.path.join(project_root, "firmware", "components",
-                                               "logging", "include", "tokens_generated.h"),
-                     "--base-dir", project_root],
-                    capture_output=True,
-                    text=True,
-                    timeout=30,
-                    cwd=project_root,
-                )
-            except Exception:
-                pass
-
-        if not os.path.isfile(csv_path):
-            return {
-                "status": "skipped",
-                "duration_ms": int((time.monotonic() - start) * 1000),
-                "note": "token_database.csv not found — skipping RTT decode",
-            }
+    if token_db_ready is None:
+        token_db_ready = _ensure_token_database(project_root)
+    if not token_db_ready:
+        return {
+            "status": "skipped",
+            "duration_ms": int((time.monotonic() - start) * 1000),
+            "note": "token_database.csv not found — skipping RTT decode",
+        }
 
-    # Run log_decoder.py — it streams indefinitely, so we use the
-    # subprocess timeout to bound its runtime.  Note: log_decoder.py does
-    # NOT support --duration; the timeout is the only time limit.
+    # Run log_decoder.py — it streams indefinitely, so a timer kills it after
+    # duration_secs.  Note: log_decoder.py does NOT support --duration; the
+    # timer is the only time limit.  Output is counted line by line as it
+    # arrives rather than buffered until the process exits.
     cmd = [
         sys.executable, decoder_script,
-        "--port", "9091",
+        "--port", str(RTT_PORTS["ch1"]),
         "--csv", csv_path,
     ]
 
-    def _count_json_lines(text: str) -> int:
-        """Count valid JSONL lines in decoder output."""
-        count = 0
-        for line in text.strip().split("\n"):
-            line = line.strip()
-            if line:
-                try:
-                    json.loads(line)
-                    count += 1
-                except json.JSONDecodeError:
-                    pass
-        return count
-
     try:
-        result = subprocess.run(
+        proc = subprocess.Popen(
             cmd,
-            capture_output=True,
-            text=True,
-            timeout=duration_secs,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
             cwd=project_root,
+            close_fds=False,  # Skip the fd-closing loop; only inheritable fds pass
         )
-        duration_ms = int((time.monotonic() - start) * 1000)
-
-        messages_decoded = _count_json_lines(result.stdout)
-
+    except OSError as e:
         return {
-            "status": "success" if messages_decoded > 0 else "warning",
-            "messages_decoded": messages_decoded,
-            "duration_ms": duration_ms,
-            "note": None if messages_decoded > 0 else "No messages decoded (check RTT connection)",
+            "status": "error",
+            "duration_ms": int((time.monotonic() - start) * 1000),
+            "error": f"Cannot start log_decoder.py: {e}",
         }
-    except subprocess.TimeoutExpired as e:
-        # Expected: the decoder runs until killed.  Collect partial output.
-        duration_ms = int((time.monotonic() - start) * 1000)
-        stdout = (e.stdout or "") if isinstance(e.stdout, str) else (e.stdout or b"").decode(errors="replace")
-        messages_decoded = _count_json_lines(stdout)
 
-        return {
-            "status": "success" if messages_decoded > 0 else "warning",
-            "messages_decoded": messages_decoded,
-            "duration_ms": duration_ms,
-            "note": None if messages_decoded > 0 else "No messages decoded within timeout",
-        }
+    timed_out = threading.Event()
+
+    def _stop_decoder():
+        timed_out.set()
+        proc.kill()
+
+    killer = threading.Timer(duration_secs, _stop_decoder)
+    killer.start()
+
+    messages_decoded = 0
+    try:
+        for line in proc.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                loads_json(line)
+                messages_decoded += 1
+            except ValueError:
+                pass
+    finally:
+        killer.cancel()
+        proc.stdout.close()
+        proc.wait()
+
+    duration_ms = int((time.monotonic() - start) * 1000)
+
+    if messages_decoded > 0:
+        note = None
+    elif timed_out.is_set():
+        # Expected: the decoder runs until killed.
+        note = "No messages decoded within timeout"
+    else:
+        note = "No messages decoded (check RTT connection)"
+
+    return {
+        "status": "success" if messages_decoded > 0 else "warning",
+        "messages_decoded": messages_decoded,
+        "duration_ms": duration_ms,
+        "note": note,
+    }
 
 
 # ===========================================================================
@@ -425,7 +551,7 @@ def run_pipeline(skip_build: bool = False, skip_flash: bool = False,
         1. Docker build (unless --skip-build)
         2. SWD flash (unless --skip-flash)
         3. RTT capture (raw binary data)
-        4. RTT decode (tokenized logs → JSON)
+        4. RTT decode (tokenized logs → JSON), concurrently with stage 3
 
     Args:
         skip_build: Skip the Docker build stage.
@@ -451,6 +577,21 @@ def run_pipeline(skip_build: bool = False, skip_flash: bool = False,
     elf_path = os.path.join(project_root, DEFAULT_ELF_PATH)
     stages = {}
 
+    # The token database only depends on the firmware sources, so generate it
+    # (if missing) in the background while the flash stage runs. A Docker
+    # build regenerates it itself, so this only applies with --skip-build.
+    # A daemon thread, so an early return (failed flash) never waits for
+    # gen_tokens.py at interpreter exit.
+    token_db_thread = None
+    token_db_result = []
+    if skip_build:
+        token_db_thread = threading.Thread(
+            target=lambda: token_db_result.append(
+                _ensure_token_database(project_root)),
+            daemon=True,
+        )
+        token_db_thread.start()
+
     # Stage 1: Build
     if skip_build:
         stages["build"] = {"status": "skipped"}
@@ -500,25 +641,51 @@ def run_pipeline(skip_build: bool = False, skip_flash: bool = False,
                 "total_duration_ms": total_duration,
             }
 
-    # Stage 3: RTT Capture
+    # Stages 3 + 4: RTT capture and decode. OpenOCD's RTT server sends
+    # channel data to every client on the port, so the decoder is started
+    # as soon as the capture has connected and runs alongside it: the pair
+    # takes one rtt_duration window rather than two, and the decoder also
+    # sees the boot-time messages (BUILD_ID) that used to go only to the
+    # capture.
     if verbose:
         print(f"  [3/4] RTT Capture: {rtt_duration}s...", file=sys.stderr)
-    stages["rtt_capture"] = stage_rtt_capture(
-        project_root, duration_secs=rtt_duration, verbose=verbose,
-    )
-    if verbose:
-        print(
-            f"  [3/4] RTT Capture: {stages['rtt_capture']['status']} "
-            f"({stages['rtt_capture'].get('bytes_received', 0)} bytes)",
-            file=sys.stderr,
+
+    def _decode():
+        token_db_ready = None
+        if token_db_thread is not None:
+            token_db_thread.join()
+            token_db_ready = bool(token_db_result and token_db_result[0])
+        return stage_rtt_decode(
+            project_root, duration_secs=rtt_duration, verbose=verbose,
+            token_db_ready=token_db_ready,
         )
 
-    # Stage 4: RTT Decode
-    if verbose:
-        print(f"  [4/4] RTT Decode: decoding...", file=sys.stderr)
-    stages["rtt_decode"] = stage_rtt_decode(
-        project_root, duration_secs=rtt_duration, verbose=verbose,
-    )
+    decode_future = None
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        def _start_decode():
+            nonlocal decode_future
+            if verbose:
+                print(f"  [4/4] RTT Decode: decoding...", file=sys.stderr)
+            decode_future = executor.submit(_decode)
+
+        stages["rtt_capture"] = stage_rtt_capture(
+            project_root, duration_secs=rtt_duration, verbose=verbose,
+            on_connected=_start_decode,
+        )
+        if verbose:
+            print(
+                f"  [3/4] RTT Capture: {stages['rtt_capture']['status']} "
+                f"({stages['rtt_capture'].get('bytes_received', 0)} bytes)",
+                file=sys.stderr,
+            )
+        if decode_future is not None:
+            stages["rtt_decode"] = decode_future.result()
+
+    if decode_future is None:
+        # The capture never reached the RTT port; still let the decoder try
+        if verbose:
+            print(f"  [4/4] RTT Decode: decoding...", file=sys.stderr)
+        stages["rtt_decode"] = _decode()
     if verbose:
         print(
             f"  [4/4] RTT Decode: {stages['rtt_decode']['status']} "
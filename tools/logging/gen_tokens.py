@@ -17,10 +17,17 @@ Usage:
 """
 
 import argparse
-import csv
+import array
+import bisect
+import concurrent.futures
+import functools
+import itertools
+import mmap
 import os
 import re
+import struct
 import sys
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
 
@@ -33,43 +40,60 @@ FNV1A_32_PRIME = 0x01000193
 FNV1A_32_MASK = 0xFFFFFFFF
 
 
-def fnv1a_hash(s: str) -> int:
-    """Compute FNV-1a 32-bit hash of a string.
-    Must produce identical results to the C implementation in log_core.c."""
+def fnv1a_bytes(data: bytes) -> int:
+    """Compute FNV-1a 32-bit hash of a byte string.
+
+    Iterating bytes yields ints directly, so the loop body is one xor,
+    one multiply and one mask per byte with no ord() call.
+    """
     h = FNV1A_32_INIT
-    for ch in s:
-        h ^= ord(ch) & 0xFF
-        h = (h * FNV1A_32_PRIME) & FNV1A_32_MASK
+    prime = FNV1A_32_PRIME
+    mask = FNV1A_32_MASK
+    for b in data:
+        h = ((h ^ b) * prime) & mask
     return h
 
 
+def fnv1a_hash(s: str) -> int:
+    """Compute FNV-1a 32-bit hash of a string.
+    Must produce identical results to the C implementation in log_core.c.
+
+    Each character contributes the low byte of its code point. Format
+    strings are ASCII in practice, so the latin-1 encode (one C-level pass)
+    covers them; wider characters take the per-character fallback."""
+    try:
+        data = s.encode('latin-1')
+    except UnicodeEncodeError:
+        data = bytes(ord(ch) & 0xFF for ch in s)
+    return fnv1a_bytes(data)
+
+
 # ===========================================================================
 # Source Scanner
 # ===========================================================================
 
-# Regex to match LOG_ERROR/WARN/INFO/DEBUG with or without _S suffix
-# Captures: level, optional _S, format string
-# Handles multi-line calls via re.DOTALL
-LOG_PATTERN = re.compile(
-    r'LOG_(ERROR|WARN|INFO|DEBUG)(_S)?\s*\(\s*"((?:[^"\\]|\\.)*)"',
-    re.MULTILINE
-)
-
-# Regex to strip C-style comments
-C_COMMENT_PATTERN = re.compile(
-    r'//.*?$|/\*.*?\*/',
-    re.MULTILINE | re.DOTALL
+# Single-pass scanner with three alternatives:
+#   1. C/C++ comments
+#   2. LOG_ERROR/WARN/INFO/DEBUG(_S)? calls
+#      Captures: level, optional _S, format string
+#   3. Any other string/char literal
+# Scanning left to right, a LOG call inside a comment is consumed by the
+# comment branch, and comment markers inside literals (e.g. "http://") by
+# the literal branch, so no comment-stripped copy of the source is needed
+# and line numbers refer to the original file. Handles multi-line calls
+# (\s matches newlines; re.DOTALL lets block comments span lines).
+# A bytes pattern, so files can be scanned straight from an mmap.
+SCAN_PATTERN = re.compile(
+    rb'//[^\n]*|/\*.*?\*/'
+    rb'|LOG_(ERROR|WARN|INFO|DEBUG)(_S)?\s*\(\s*"((?:[^"\\]|\\.)*)"'
+    rb'|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'',
+    re.DOTALL
 )
 
 # Parse printf-style format specifiers to extract arg types
 FORMAT_SPEC_PATTERN = re.compile(r'%[-+0 #]*\d*\.?\d*[hlLzjt]*([diouxXeEfFgGaAcspn%])')
 
 
-def strip_comments(source: str) -> str:
-    """Remove C-style comments from source code."""
-    return C_COMMENT_PATTERN.sub('', source)
-
-
 def parse_arg_types(fmt_string: str) -> str:
     """Extract argument type characters from a printf-style format string.
 
@@ -96,6 +120,17 @@ def parse_arg_types(fmt_string: str) -> str:
     return ''.join(types)
 
 
+def _newline_offsets(data) -> array.array:
+    """Return the sorted offsets of every newline in data."""
+    offsets = array.array('q')
+    find = data.find
+    pos = find(b'\n')
+    while pos != -1:
+        offsets.append(pos)
+        pos = find(b'\n', pos + 1)
+    return offsets
+
+
 def scan_file(filepath: str, base_dir: str) -> list:
     """Scan a single source file for LOG_xxx() calls.
 
@@ -103,57 +138,110 @@ def scan_file(filepath: str, base_dir: str) -> list:
     """
     results = []
     try:
-        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
-            source = f.read()
-    except (OSError, IOError) as e:
+        fd = os.open(filepath, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    except OSError as e:
         print(f"  WARNING: Cannot read {filepath}: {e}", file=sys.stderr)
         return results
 
-    # Strip comments to avoid matching log calls in comments
-    clean_source = strip_comments(source)
+    # Scan the page-cache mapping directly rather than a decoded copy of
+    # the whole file; only captured format strings are decoded.
+    try:
+        if os.fstat(fd).st_size == 0:
+            return results  # mmap cannot map an empty file
+        source = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        print(f"  WARNING: Cannot read {filepath}: {e}", file=sys.stderr)
+        return results
+    finally:
+        os.close(fd)  # the mapping stays valid once the fd is closed
+
+    rel_path = os.path.relpath(filepath, base_dir)
+
+    # Newline offsets are collected once per file (only if it has a LOG
+    # call) with C-level find(); each match's line number is then a bisect.
+    newlines = None
+    with source:
+        for m in SCAN_PATTERN.finditer(source):
+            level = m.group(1)  # ERROR, WARN, INFO, DEBUG
+            if level is None:
+                continue  # comment or unrelated literal
+            is_simple = m.group(2) is not None  # _S suffix
+            fmt_string = m.group(3).decode('utf-8', errors='replace')
+
+            if newlines is None:
+                newlines = _newline_offsets(source)
+            line_num = bisect.bisect_right(newlines, m.start()) + 1
+
+            arg_types = parse_arg_types(fmt_string)
+
+            results.append({
+                'level': level.decode('ascii'),
+                'fmt': fmt_string,
+                'arg_types': arg_types,
+                'file': rel_path,
+                'line': line_num,
+                'has_args': not is_simple,
+            })
 
-    # We need line numbers, so scan the original source with offsets
-    # But match against cleaned source
-    for m in LOG_PATTERN.finditer(clean_source):
-        level = m.group(1)  # ERROR, WARN, INFO, DEBUG
-        is_simple = m.group(2) is not None  # _S suffix
-        fmt_string = m.group(3)
+    return results
 
-        # Compute line number from offset in cleaned source
-        line_num = clean_source[:m.start()].count('\n') + 1
 
-        # Get relative path
-        rel_path = os.path.relpath(filepath, base_dir)
+def _iter_sources(scan_dirs: list):
+    """Yield .c/.h paths under scan_dirs in os.walk() (top-down) order.
 
-        arg_types = parse_arg_types(fmt_string)
+    Uses os.scandir() directly: DirEntry carries the file type from the
+    directory read, so classifying entries needs no per-file stat().
+    Files are sorted within each directory; symlinked directories are not
+    followed and unreadable directories are skipped, as with os.walk().
+    """
+    stack = list(reversed(scan_dirs))
+    while stack:
+        directory = stack.pop()
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.name.endswith(('.c', '.h')) and entry.is_file():
+                        files.append(entry.path)
+        except OSError:
+            continue
+        files.sort()
+        yield from files
+        stack.extend(reversed(subdirs))
 
-        results.append({
-            'level': level,
-            'fmt': fmt_string,
-            'arg_types': arg_types,
-            'file': rel_path,
-            'line': line_num,
-            'has_args': not is_simple,
-        })
 
-    return results
+# Below this many files, process-pool startup costs more than it saves
+PARALLEL_SCAN_MIN_FILES = 16
 
 
 def scan_directories(scan_dirs: list, base_dir: str) -> list:
-    """Recursively scan directories for .c and .h files."""
-    all_tokens = []
-    files_scanned = 0
-
-    for scan_dir in scan_dirs:
-        for root, _dirs, files in os.walk(scan_dir):
-            for fname in sorted(files):
-                if fname.endswith(('.c', '.h')):
-                    filepath = os.path.join(root, fname)
-                    tokens = scan_file(filepath, base_dir)
-                    all_tokens.extend(tokens)
-                    files_scanned += 1
-
-    print(f"  Scanned {files_scanned} files, found {len(all_tokens)} LOG_xxx calls")
+    """Recursively scan directories for .c and .h files.
+
+    Files are collected first, then scanned in parallel across CPU cores
+    when there are enough of them. Results keep the serial walk order, so
+    the first occurrence of each format string (and the database built
+    from it) is the same either way.
+    """
+    filepaths = list(_iter_sources(scan_dirs))
+
+    scan = functools.partial(scan_file, base_dir=base_dir)
+    per_file = None
+    if len(filepaths) >= PARALLEL_SCAN_MIN_FILES:
+        try:
+            with concurrent.futures.ProcessPoolExecutor() as executor:
+                per_file = list(executor.map(scan, filepaths, chunksize=16))
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            # No multiprocessing support, or a worker died: scan serially
+            per_file = None
+    if per_file is None:
+        per_file = map(scan, filepaths)
+
+    all_tokens = list(itertools.chain.from_iterable(per_file))
+
+    print(f"  Scanned {len(filepaths)} files, found {len(all_tokens)} LOG_xxx calls")
     return all_tokens
 
 
@@ -172,12 +260,13 @@ def build_token_database(tokens: list) -> dict:
 
     for tok in tokens:
         fmt = tok['fmt']
-        h = fnv1a_hash(fmt)
-
         if fmt in fmt_to_hash:
             # Same format string seen again — not a collision, just duplicate
+            # (checked first so each unique string is hashed only once)
             continue
 
+        h = fnv1a_hash(fmt)
+
         if h in db and db[h]['fmt'] != fmt:
             # COLLISION: two different strings produce same hash
             print(f"  FATAL: Hash collision detected!", file=sys.stderr)
@@ -201,13 +290,17 @@ def build_token_database(tokens: list) -> dict:
 
 
 def compute_build_id(db: dict) -> int:
-    """Compute BUILD_ID as FNV-1a of sorted comma-joined hashes.
-    Deterministic: same tokens → same BUILD_ID."""
+    """Compute BUILD_ID as FNV-1a over the sorted token hashes.
+
+    The hashes are packed as consecutive little-endian uint32 words (4
+    bytes per token, no text formatting). Deterministic: same tokens → same
+    BUILD_ID. The firmware never recomputes this value — it only compiles
+    in AI_LOG_BUILD_ID from tokens_generated.h — so the header and the CSV
+    written from the same run always agree."""
     if not db:
         return 0
     sorted_hashes = sorted(db.keys())
-    hash_str = ','.join(f'0x{h:08x}' for h in sorted_hashes)
-    return fnv1a_hash(hash_str)
+    return fnv1a_bytes(struct.pack(f'<{len(sorted_hashes)}I', *sorted_hashes))
 
 
 # ===========================================================================
@@ -224,7 +317,7 @@ def write_header(path: str, build_id: int, token_count: int):
  * Regenerate with: python3 tools/logging/gen_tokens.py
  *
  * This file provides:
- *   - AI_LOG_BUILD_ID: Hash of all known log format strings
+ *   - AI_LOG_BUILD_ID: FNV-1a of all token hashes (sorted, packed as LE uint32)
  *   - AI_LOG_TOKEN_COUNT: Number of unique log call sites
  */
 #ifndef TOKENS_GENERATED_H
@@ -243,28 +336,38 @@ def write_header(path: str, build_id: int, token_count: int):
     print(f"  Written: {path} (BUILD_ID=0x{build_id:08x}, {token_count} tokens)")
 
 
+def _csv_field(value) -> str:
+    """Quote a field the way csv.writer's default dialect does."""
+    text = str(value)
+    if ',' in text or '"' in text or '\n' in text or '\r' in text:
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
 def write_csv(path: str, db: dict, build_id: int):
-    """Write token_database.csv for the host decoder."""
+    """Write token_database.csv for the host decoder.
+
+    The schema is fixed and only the format string (and, in theory, the
+    file path) can need quoting, so rows are formatted directly instead of
+    going through csv.writer. Output is byte-identical to the default csv
+    dialect, including its CRLF line terminator.
+    """
     os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Header row, then BUILD_ID as metadata row
+    lines = [
+        'token_hash,level,format_string,arg_types,file,line',
+        f'# build_id=0x{build_id:08x}',
+    ]
+    # Token entries sorted by hash for deterministic output
+    for h in sorted(db.keys()):
+        entry = db[h]
+        lines.append(
+            f"0x{h:08x},{entry['level']},{_csv_field(entry['fmt'])},"
+            f"{entry['arg_types']},{_csv_field(entry['file'])},{entry['line']}"
+        )
+    lines.append('')
     with open(path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        # Header row
-        writer.writerow(['token_hash', 'level', 'format_string', 'arg_types', 'file', 'line'])
-
-        # Write BUILD_ID as metadata row
-        writer.writerow([f'# build_id=0x{build_id:08x}'])
-
-        # Token entries sorted by hash for deterministic output
-        for h in sorted(db.keys()):
-            entry = db[h]
-            writer.writerow([
-                f'0x{h:08x}',
-                entry['level'],
-                entry['fmt'],
-                entry['arg_types'],
-                entry['file'],
-                entry['line'],
-            ])
+        f.write('\r\n'.join(lines))
     print(f"  Written: {path} ({len(db)} entries)")
 
 
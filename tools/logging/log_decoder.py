@@ -27,14 +27,21 @@ Usage:
 
 import argparse
 import csv
+import functools
 import json
 import socket
 import struct
 import sys
 import time
+from collections import namedtuple
 from datetime import datetime, timezone
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # Optional: stdlib json is used when orjson is absent
+    orjson = None
+
 
 # ===========================================================================
 # Level Names
@@ -47,6 +54,29 @@ LEVEL_NAMES = {
     3: "DEBUG",
 }
 
+# Level name for every value of the packet's 4-bit level field
+LEVEL_BY_NIBBLE = tuple(LEVEL_NAMES.get(i, 'UNKNOWN') for i in range(16))
+
+# Formatted messages remembered per stream, keyed on (token, args)
+MESSAGE_CACHE_SIZE = 4096
+
+# Decoded lines are written out in batches of at most this many, and
+# before every socket read (so a stream that pauses, even mid-packet,
+# never holds output back)
+OUTPUT_BATCH_LINES = 256
+
+
+def encode_jsonl(record: dict) -> bytes:
+    """Serialize one record as a compact UTF-8 JSON line, newline included.
+
+    Uses orjson when installed, falling back to the stdlib json module with
+    the same format (no spaces after separators, non-ASCII unescaped).
+    """
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, separators=(',', ':'), ensure_ascii=False)
+            + '\n').encode('utf-8')
+
 
 # ===========================================================================
 # Varint Decoding
@@ -56,20 +86,40 @@ def decode_varint(data: bytes, offset: int) -> tuple:
     """Decode a varint from bytes at the given offset.
 
     Returns (value, bytes_consumed).
+
+    Unrolled for the at most 5 bytes a uint32 needs; most values are small
+    and return after the first comparison. A varint truncated by the end of
+    data yields the bits read so far.
     """
-    result = 0
-    shift = 0
-    i = offset
-    while i < len(data):
-        byte = data[i]
-        result |= (byte & 0x7F) << shift
-        i += 1
-        if (byte & 0x80) == 0:
-            break
-        shift += 7
-        if shift >= 35:  # uint32 max is 5 bytes
-            break
-    return result, i - offset
+    end = len(data)
+    if offset >= end:
+        return 0, 0
+    b = data[offset]
+    if b < 0x80:
+        return b, 1
+    result = b & 0x7F
+    if offset + 1 >= end:
+        return result, 1
+    b = data[offset + 1]
+    if b < 0x80:
+        return result | (b << 7), 2
+    result |= (b & 0x7F) << 7
+    if offset + 2 >= end:
+        return result, 2
+    b = data[offset + 2]
+    if b < 0x80:
+        return result | (b << 14), 3
+    result |= (b & 0x7F) << 14
+    if offset + 3 >= end:
+        return result, 3
+    b = data[offset + 3]
+    if b < 0x80:
+        return result | (b << 21), 4
+    result |= (b & 0x7F) << 21
+    if offset + 4 >= end:
+        return result, 4
+    # uint32 max is 5 bytes: stop here whatever the continuation bit says
+    return result | ((data[offset + 4] & 0x7F) << 28), 5
 
 
 def zigzag_decode(n: int) -> int:
@@ -80,26 +130,94 @@ def zigzag_decode(n: int) -> int:
     return (n >> 1) ^ -(n & 1)
 
 
+# zigzag_decode() of every single-byte varint
+_ZIGZAG_BYTE = tuple(zigzag_decode(b) for b in range(0x80))
+
+
+def decode_short_varints(data, offset: int, count: int):
+    """Decode count consecutive varints that are each one byte long.
+
+    Masked-VByte style shortcut: one C-level max() over the bytes checks
+    every continuation bit at once; when none is set, each byte is its own
+    value and decoding is a table lookup. Returns the zigzag-decoded list,
+    or None if any varint is longer. The caller ensures count bytes exist.
+    """
+    chunk = data[offset:offset + count]
+    if max(chunk) >= 0x80:
+        return None
+    return list(map(_ZIGZAG_BYTE.__getitem__, chunk))
+
+
+# Bit 7 of each byte, for SWAR windows of 0..8 bytes
+_CONTINUATION_BITS = tuple(int.from_bytes(b'\x80' * n, 'little') for n in range(9))
+
+
+def skip_varints(data, offset: int, count: int, end: int):
+    """Return the offset just past count varints, without decoding them.
+
+    SWAR scan: up to 8 bytes are loaded as one little-endian integer and
+    ~word & 0x8080... marks every byte with its continuation bit clear,
+    i.e. every varint's last byte. Dropping the lowest count - 1 marks
+    leaves the terminator of the last varint. Returns None if those
+    terminators are not all within the first min(8, end - offset) bytes.
+    """
+    width = min(8, end - offset)
+    if width <= 0:
+        return None
+    word = int.from_bytes(data[offset:offset + width], 'little')
+    stops = ~word & _CONTINUATION_BITS[width]
+    for _ in range(count - 1):
+        stops &= stops - 1  # Clear the lowest terminator
+    if not stops:
+        return None
+    return offset + ((stops & -stops).bit_length() >> 3)
+
+
 # ===========================================================================
 # Token Database Loader
 # ===========================================================================
 
+# One decoded token_database.csv row. A tuple rather than a dict: the
+# decoder reads several fields per packet, and attribute access by fixed
+# position skips a string hash probe for each.
+TokenEntry = namedtuple('TokenEntry', [
+    'level', 'fmt', 'arg_types', 'file', 'line', 'token_hex',
+    'compiled', 'static_msg', 'render', 'arg_specs', 'decode_args',
+])
+
+
 def load_token_database(csv_path: str) -> tuple:
     """Load token_database.csv into a lookup dict.
 
     Returns (db, build_id) where:
-        db = {hash_int: {level, fmt, arg_types, file, line}}
+        db = {hash_int: TokenEntry(level, fmt, arg_types, file, line,
+                                   token_hex, compiled, static_msg, render,
+                                   arg_specs, decode_args)}
         build_id = int or None
+
+    static_msg is the message rendered with no arguments, used as-is for
+    zero-arg packets; render formats exactly arg_specs args in one %
+    operation (see compile_renderer); decode_args is the generated decoder
+    for the token's arg layout (see compile_arg_decoder).
     """
     db = {}
     build_id = None
-
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        header = next(reader)  # Skip header row
-
-        for row in reader:
-            if not row:
+    # Level names, arg type strings and file paths repeat across many rows;
+    # keep one shared copy of each instead of one string per entry
+    strings = {}
+    shared = strings.setdefault
+
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        next(f, None)  # Skip header row
+
+        for line in f:
+            # Rows without quotes (most of them) split directly; a quoted
+            # field may hold commas or doubled quotes, so let csv parse it.
+            if '"' in line:
+                row = next(csv.reader([line]), [])
+            else:
+                row = line.rstrip('\r\n').split(',')
+            if not row or not row[0]:
                 continue
 
             # Check for build_id metadata comment
@@ -115,13 +233,21 @@ def load_token_database(csv_path: str) -> tuple:
                 continue
 
             token_hash = int(row[0], 16)
-            db[token_hash] = {
-                'level': row[1],
-                'fmt': row[2],
-                'arg_types': row[3],
-                'file': row[4],
-                'line': int(row[5]),
-            }
+            compiled = compile_format(row[2])
+            render, arg_specs = compile_renderer(compiled)
+            db[token_hash] = TokenEntry(
+                level=shared(row[1], row[1]),
+                fmt=row[2],
+                arg_types=shared(row[3], row[3]),
+                file=shared(row[4], row[4]),
+                line=int(row[5]),
+                token_hex=f'0x{token_hash:08x}',
+                compiled=compiled,
+                static_msg=render_message(compiled, ()),
+                render=render,
+                arg_specs=arg_specs,
+                decode_args=compile_arg_decoder(arg_kinds(row[3], len(row[3]))),
+            )
 
     return db, build_id
 
@@ -130,126 +256,317 @@ def load_token_database(csv_path: str) -> tuple:
 # Packet Decoder
 # ===========================================================================
 
-def decode_args(data: bytes, offset: int, arg_count: int, arg_types: str) -> tuple:
-    """Decode arguments from packet data.
+# Precompiled packet layouts: header = token ID (u32 LE) + level/arg-count
+# byte; float args are raw IEEE754 (f32 LE)
+PACKET_HEADER = struct.Struct('<IB')
+FLOAT_ARG = struct.Struct('<f')
 
-    Returns (args_list, bytes_consumed).
+
+def arg_kinds(arg_types: str, arg_count: int) -> str:
+    """Map arg_types to one kind per packet arg: 'f' float, 'v' varint.
+
+    Args missing from arg_types (or not marked 'f') are ZigZag varints.
     """
-    args = []
-    pos = offset
+    return ''.join('f' if t == 'f' else 'v'
+                   for t in arg_types[:arg_count]).ljust(arg_count, 'v')
 
-    for i in range(arg_count):
-        if pos >= len(data):
-            break
 
-        # Determine if this arg is a float based on arg_types from CSV
-        is_float = (i < len(arg_types) and arg_types[i] == 'f')
+@functools.lru_cache(maxsize=None)
+def compile_arg_decoder(kinds: str):
+    """Generate a straight-line decoder for one argument layout.
 
-        if is_float:
-            # Raw IEEE754 float, 4 bytes LE
-            if pos + 4 > len(data):
-                break
-            val = struct.unpack('<f', data[pos:pos + 4])[0]
-            args.append(val)
-            pos += 4
+    kinds is an arg_kinds() string. The returned function takes
+    (data, offset) and returns (args_list, end_offset). It does not check
+    bounds: the caller must have every arg buffered.
+    Decoders are shared by all tokens with the same layout.
+    """
+    lines = ['def decode(data, pos):']
+    names = []
+    for i, kind in enumerate(kinds):
+        name = f'a{i}'
+        names.append(name)
+        if kind == 'f':
+            lines.append(f'    {name}, = unpack_f32(data, pos)')
+            lines.append('    pos += 4')
         else:
-            # ZigZag varint
-            raw_val, consumed = decode_varint(data, pos)
-            val = zigzag_decode(raw_val)
-            args.append(val)
-            pos += consumed
-
-    return args, pos - offset
+            lines.append(f'    {name}, n = decode_varint(data, pos)')
+            lines.append(f'    {name} = ({name} >> 1) ^ -({name} & 1)')
+            lines.append('    pos += n')
+    lines.append(f'    return [{", ".join(names)}], pos')
+
+    namespace = {'unpack_f32': FLOAT_ARG.unpack_from,
+                 'decode_varint': decode_varint}
+    exec(compile('\n'.join(lines), f'<arg decoder {kinds!r}>', 'exec'), namespace)
+    return namespace['decode']
+
+
+def _format_float(val) -> str:
+    return f'{val:.6f}'
+
+
+# Conversion char → formatter for one argument (anything else: str())
+_FORMATTERS = {
+    'd': lambda v: str(int(v)),
+    'i': lambda v: str(int(v)),
+    'u': lambda v: str(int(v) & 0xFFFFFFFF),
+    'x': lambda v: format(int(v) & 0xFFFFFFFF, 'x'),
+    'X': lambda v: format(int(v) & 0xFFFFFFFF, 'X'),
+    'f': _format_float, 'F': _format_float,
+    'e': _format_float, 'E': _format_float,
+    'g': _format_float, 'G': _format_float,
+    's': str,
+}
 
 
-def format_message(fmt_string: str, args: list) -> str:
-    """Substitute args into a printf-style format string.
+def compile_format(fmt_string: str) -> list:
+    """Pre-parse a printf-style format string into segments.
 
-    Simple substitution — handles %d, %u, %x, %f, %s.
+    Returns a list whose items are either literal strings or
+    (formatter, spec_text) tuples, one per argument-consuming specifier.
+    spec_text is emitted verbatim when the packet carries too few args.
+    Parsing once per token (at database load) keeps the per-character
+    scanning out of the packet loop.
     """
-    result = fmt_string
-    arg_idx = 0
-
-    # Replace format specifiers one at a time
+    segments = []
+    literal = []
+    n = len(fmt_string)
     i = 0
-    output = []
-    while i < len(result):
-        if result[i] == '%' and i + 1 < len(result):
+    while i < n:
+        if fmt_string[i] == '%' and i + 1 < n:
             # Find the format specifier
             j = i + 1
             # Skip flags
-            while j < len(result) and result[j] in '-+0 #':
+            while j < n and fmt_string[j] in '-+0 #':
                 j += 1
             # Skip width
-            while j < len(result) and result[j].isdigit():
+            while j < n and fmt_string[j].isdigit():
                 j += 1
             # Skip precision
-            if j < len(result) and result[j] == '.':
+            if j < n and fmt_string[j] == '.':
                 j += 1
-                while j < len(result) and result[j].isdigit():
+                while j < n and fmt_string[j].isdigit():
                     j += 1
             # Skip length modifier
-            while j < len(result) and result[j] in 'hlLzjt':
+            while j < n and fmt_string[j] in 'hlLzjt':
                 j += 1
             # Conversion specifier
-            if j < len(result):
-                spec = result[j]
+            if j < n:
+                spec = fmt_string[j]
                 if spec == '%':
-                    output.append('%')
-                elif arg_idx < len(args):
-                    val = args[arg_idx]
-                    arg_idx += 1
-                    if spec in ('d', 'i'):
-                        output.append(str(int(val)))
-                    elif spec == 'u':
-                        output.append(str(int(val) & 0xFFFFFFFF))
-                    elif spec in ('x', 'X'):
-                        fmt = f'{{:{"x" if spec == "x" else "X"}}}'
-                        output.append(fmt.format(int(val) & 0xFFFFFFFF))
-                    elif spec in ('f', 'F', 'e', 'E', 'g', 'G'):
-                        output.append(f'{val:.6f}')
-                    elif spec == 's':
-                        output.append(str(val))
-                    else:
-                        output.append(str(val))
+                    literal.append('%')
                 else:
-                    output.append(result[i:j + 1])  # Not enough args
+                    if literal:
+                        segments.append(''.join(literal))
+                        literal = []
+                    segments.append((_FORMATTERS.get(spec, str), fmt_string[i:j + 1]))
                 i = j + 1
                 continue
-        output.append(result[i])
+        literal.append(fmt_string[i])
         i += 1
+    if literal:
+        segments.append(''.join(literal))
+    return segments
 
+
+def render_message(segments: list, args: list) -> str:
+    """Substitute args into a format string pre-parsed by compile_format()."""
+    output = []
+    arg_idx = 0
+    n_args = len(args)
+    for seg in segments:
+        if seg.__class__ is str:
+            output.append(seg)
+        elif arg_idx < n_args:
+            output.append(seg[0](args[arg_idx]))
+            arg_idx += 1
+        else:
+            output.append(seg[1])  # Not enough args
     return ''.join(output)
 
 
+# Conversion char → (%-operator spec, argument expression) for
+# compile_renderer(); must agree with _FORMATTERS (anything else: %s)
+_PY_SPECS = {
+    'd': ('%d', '{}'), 'i': ('%d', '{}'),
+    'u': ('%d', 'int({}) & 0xFFFFFFFF'),
+    'x': ('%x', 'int({}) & 0xFFFFFFFF'),
+    'X': ('%X', 'int({}) & 0xFFFFFFFF'),
+    'f': ('%.6f', '{}'), 'F': ('%.6f', '{}'),
+    'e': ('%.6f', '{}'), 'E': ('%.6f', '{}'),
+    'g': ('%.6f', '{}'), 'G': ('%.6f', '{}'),
+}
+
+
+def compile_renderer(segments: list):
+    """Translate a compiled format into a single %-operator expression.
+
+    Returns (render, arg_specs): arg_specs is the number of specifiers and
+    render(args) formats exactly that many args with one C-level
+    ``fmt % (...)``, producing the same text as render_message(). Only the
+    unsigned/hex conversions need an argument expression (the 32-bit mask);
+    the rest pass args straight through. Any other arg count must go
+    through render_message().
+    """
+    py_fmt = []
+    exprs = []
+    for seg in segments:
+        if seg.__class__ is str:
+            py_fmt.append(seg.replace('%', '%%'))
+        else:
+            spec, expr = _PY_SPECS.get(seg[1][-1], ('%s', '{}'))
+            py_fmt.append(spec)
+            exprs.append(expr.format(f'a{len(exprs)}'))
+    if not exprs:
+        return None, 0
+
+    names = ', '.join(f'a{i}' for i in range(len(exprs)))
+    source = (f'def render(args):\n'
+              f'    {names}, = args\n'
+              f'    return FMT % ({", ".join(exprs)},)\n')
+    namespace = {'FMT': ''.join(py_fmt)}
+    exec(compile(source, '<message renderer>', 'exec'), namespace)
+    return namespace['render'], len(exprs)
+
+
 # ===========================================================================
 # Stream Reader
 # ===========================================================================
 
 class RTTStreamReader:
-    """Buffered reader for RTT TCP stream."""
+    """Buffered reader for RTT TCP stream.
+
+    Data is received straight into a preallocated buffer with recv_into().
+    Reads advance a head index instead of deleting from the front of the
+    buffer; unread bytes are moved back to offset 0 only once the head has
+    passed the middle (or the buffer is full), so each byte is shifted at
+    most about once.
+
+    before_recv, if set, is called before every receive, i.e. whenever the
+    next read cannot be served from the buffer and may block.
+    """
+
+    BUFFER_SIZE = 65536
 
     def __init__(self, sock: socket.socket):
         self.sock = sock
-        self.buffer = bytearray()
+        self.buf = bytearray(self.BUFFER_SIZE)
+        self.mv = memoryview(self.buf)
+        self.head = 0
+        self.tail = 0
+        self.before_recv = None
+
+    def _compact(self):
+        """Move unread bytes to the start of the buffer."""
+        count = self.tail - self.head
+        self.buf[:count] = self.buf[self.head:self.tail]
+        self.head = 0
+        self.tail = count
+
+    def _fill(self, n: int):
+        """Receive until at least n unread bytes are buffered.
+
+        The socket is blocking (see connect_with_retry), so each receive
+        waits for data rather than timing out.
+        """
+        while self.tail - self.head < n:
+            if len(self.buf) - self.head < n:
+                # Not enough room after head: compact, then grow if needed
+                self._compact()
+                if len(self.buf) < n:
+                    self.mv.release()
+                    self.buf.extend(bytes(n - len(self.buf)))
+                    self.mv = memoryview(self.buf)
+            elif self.tail == len(self.buf):
+                self._compact()
+            if self.before_recv is not None:
+                self.before_recv()
+            received = self.sock.recv_into(self.mv[self.tail:])
+            if not received:
+                raise ConnectionError("RTT connection closed")
+            self.tail += received
 
     def read_bytes(self, n: int) -> bytes:
         """Read exactly n bytes from the stream (blocking)."""
-        while len(self.buffer) < n:
-            try:
-                data = self.sock.recv(4096)
-                if not data:
-                    raise ConnectionError("RTT connection closed")
-                self.buffer.extend(data)
-            except socket.timeout:
-                continue
-        result = bytes(self.buffer[:n])
-        del self.buffer[:n]
+        if self.tail - self.head < n:
+            self._fill(n)
+        head = self.head
+        result = self.mv[head:head + n].tobytes()
+        head += n
+        if head == self.tail:
+            self.head = self.tail = 0
+        else:
+            self.head = head
+            if head > len(self.buf) // 2:
+                self._compact()
         return result
 
+    def unpack(self, layout: struct.Struct) -> tuple:
+        """Read one struct layout from the stream (blocking).
+
+        Unpacks straight from the buffer, without copying the bytes out.
+        """
+        size = layout.size
+        if self.tail - self.head < size:
+            self._fill(size)
+        values = layout.unpack_from(self.buf, self.head)
+        self.skip(size)
+        return values
+
+    def read_varint(self) -> int:
+        """Read one varint (at most 5 bytes) from the stream (blocking).
+
+        The bytes are decoded where they sit in the buffer; the socket is
+        only touched when the varint is not yet complete.
+        """
+        n = 1
+        while True:
+            if self.tail - self.head < n:
+                self._fill(n)
+            if self.buf[self.head + n - 1] < 0x80 or n == 5:
+                break
+            n += 1
+        value, _ = decode_varint(self.buf, self.head)
+        self.skip(n)
+        return value
+
+    def skip(self, n: int):
+        """Discard n bytes that are already buffered (see peek_available)."""
+        head = self.head + n
+        if head == self.tail:
+            self.head = self.tail = 0
+        else:
+            self.head = head
+            if head > len(self.buf) // 2:
+                self._compact()
+
     def peek_available(self) -> int:
         """Return number of buffered bytes."""
-        return len(self.buffer)
+        return self.tail - self.head
+
+
+# ===========================================================================
+# Timestamps
+# ===========================================================================
+
+_ts_second = None
+_ts_prefix = ''
+
+
+def utc_timestamp() -> str:
+    """Return the current UTC time in datetime.isoformat() form.
+
+    Same output as datetime.now(timezone.utc).isoformat(), but the
+    date/time prefix is only re-rendered when the second changes; in
+    between, only the microseconds are formatted.
+    """
+    global _ts_second, _ts_prefix
+    second, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    if second != _ts_second:
+        _ts_prefix = datetime.fromtimestamp(second, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+        _ts_second = second
+    if micros:
+        return f'{_ts_prefix}.{micros:06d}+00:00'
+    return _ts_prefix + '+00:00'  # isoformat() drops a zero fraction
 
 
 # ===========================================================================
@@ -258,129 +575,188 @@ class RTTStreamReader:
 
 def decode_stream(reader: RTTStreamReader, db: dict, expected_build_id: int,
                   output_file=None, validate_build_id: bool = True):
-    """Continuously decode packets from RTT stream and emit JSON."""
+    """Continuously decode packets from RTT stream and emit JSON.
+
+    Lines go to output_file, a binary file object (default: stdout).
+    """
     packet_count = 0
+
+    # Recurring packets (heartbeats, counters cycling through a few values)
+    # format once. The cache belongs to this db; a reloaded database gets a
+    # fresh one. Float args are not cached: -0.0 == 0.0 would share a key.
+    @functools.lru_cache(maxsize=MESSAGE_CACHE_SIZE)
+    def _format_cached(token_hash: int, args_tuple: tuple) -> str:
+        return db[token_hash].render(args_tuple)
+
     first_packet = True
 
-    out = output_file if output_file else sys.stdout
+    # Lines are encoded once, straight to UTF-8 bytes, and written to the
+    # binary stream without a text layer in between
+    out = output_file if output_file else sys.stdout.buffer
+    pending = []
 
-    while True:
-        try:
-            # 1. Read token ID (4 bytes, LE)
-            token_bytes = reader.read_bytes(4)
-            token_id = struct.unpack('<I', token_bytes)[0]
-
-            # 2. Read level + arg count (1 byte)
-            meta_byte = reader.read_bytes(1)[0]
-            level = (meta_byte >> 4) & 0x0F
-            arg_count = meta_byte & 0x0F
-
-            # 3. Look up token in database
-            entry = db.get(token_id)
-
-            if entry:
-                arg_types = entry.get('arg_types', '')
-
-                # Read enough data for args (estimate: max 5 bytes per varint arg,
-                # 4 bytes per float arg)
-                max_arg_bytes = 0
-                for i in range(arg_count):
-                    is_float = (i < len(arg_types) and arg_types[i] == 'f')
-                    max_arg_bytes += 4 if is_float else 5
-
-                if arg_count > 0 and max_arg_bytes > 0:
-                    # Read arg data — we read byte by byte through varints
-                    args = []
-                    for i in range(arg_count):
-                        is_float = (i < len(arg_types) and arg_types[i] == 'f')
-                        if is_float:
-                            float_bytes = reader.read_bytes(4)
-                            val = struct.unpack('<f', float_bytes)[0]
-                            args.append(val)
+    # Single-entry cache: bursts of one token skip the db probe
+    last_token_id = -1
+    last_entry = None
+
+    def _flush():
+        if pending:
+            out.write(b''.join(pending))
+            out.flush()
+            pending.clear()
+
+    # Write queued lines before any read that may block, including one that
+    # waits for the rest of a packet split across TCP segments
+    reader.before_recv = _flush
+
+    try:
+        while True:
+            try:
+                # 1. Read the header in one call: token ID (4 bytes, LE) and
+                # 2. level + arg count (1 byte)
+                token_id, meta_byte = reader.unpack(PACKET_HEADER)
+                ts = utc_timestamp()  # One timestamp per packet, on arrival
+                level = (meta_byte >> 4) & 0x0F
+                arg_count = meta_byte & 0x0F
+
+                # 3. Look up token in database
+                if token_id == last_token_id:
+                    entry = last_entry
+                else:
+                    entry = last_entry = db.get(token_id)
+                    last_token_id = token_id
+
+                if entry:
+                    arg_types = entry.arg_types
+
+                    if not arg_count:
+                        args = []
+                    elif (arg_count == 1 and arg_types[:1] != 'f'
+                          and reader.peek_available() >= 5):
+                        # Single varint (the common counter case)
+                        raw_val, consumed = decode_varint(reader.buf, reader.head)
+                        reader.skip(consumed)
+                        args = [zigzag_decode(raw_val)]
+                    elif reader.peek_available() >= arg_count * 5:
+                        # Every arg is already buffered (at most 5 bytes for a
+                        # varint, 4 for a float): decode them in place
+                        args = None
+                        if 'f' not in arg_types:
+                            # All-integer packet: small values skip the per-arg loop
+                            args = decode_short_varints(reader.buf, reader.head, arg_count)
+                        if args is not None:
+                            reader.skip(arg_count)
                         else:
-                            # Read varint byte by byte
-                            varint_bytes = bytearray()
-                            while True:
-                                b = reader.read_bytes(1)[0]
-                                varint_bytes.append(b)
-                                if (b & 0x80) == 0:
-                                    break
-                                if len(varint_bytes) >= 5:
-                                    break
-                            raw_val, _ = decode_varint(bytes(varint_bytes), 0)
-                            args.append(zigzag_decode(raw_val))
+                            if arg_count == len(arg_types):
+                                decode = entry.decode_args
+                            else:
+                                decode = compile_arg_decoder(
+                                    arg_kinds(arg_types, arg_count))
+                            args, end = decode(reader.buf, reader.head)
+                            reader.skip(end - reader.head)
+                    else:
+                        # Partial packet: read each arg as it arrives
+                        args = []
+                        for i in range(arg_count):
+                            is_float = (i < len(arg_types) and arg_types[i] == 'f')
+                            if is_float:
+                                args.append(reader.unpack(FLOAT_ARG)[0])
+                            else:
+                                args.append(zigzag_decode(reader.read_varint()))
+
+                    # Format the message
+                    if not args:
+                        msg = entry.static_msg
+                    elif len(args) != entry.arg_specs:
+                        msg = render_message(entry.compiled, args)
+                    elif len(args) == 1 or 'f' in arg_types:
+                        msg = entry.render(args)
+                    else:
+                        msg = _format_cached(token_id, tuple(args))
+
+                    record = {
+                        'ts': ts,
+                        'level': entry.level,
+                        'msg': msg,
+                        'token': entry.token_hex,
+                        'file': entry.file,
+                        'line': entry.line,
+                        'raw_args': args,
+                    }
                 else:
-                    args = []
-
-                # Format the message
-                msg = format_message(entry['fmt'], args)
-                level_name = entry['level']
-
-                record = {
-                    'ts': datetime.now(timezone.utc).isoformat(),
-                    'level': level_name,
-                    'msg': msg,
-                    'token': f'0x{token_id:08x}',
-                    'file': entry['file'],
-                    'line': entry['line'],
-                    'raw_args': args,
-                }
-            else:
-                # Unknown token
-                record = {
-                    'ts': datetime.now(timezone.utc).isoformat(),
-                    'level': LEVEL_NAMES.get(level, 'UNKNOWN'),
-                    'msg': f'<unknown token 0x{token_id:08x}>',
-                    'token': f'0x{token_id:08x}',
-                    'raw_args': [],
-                }
-
-                # Try to skip arg_count args (best effort)
-                for _ in range(arg_count):
-                    try:
-                        b = reader.read_bytes(1)[0]
-                        if (b & 0x80) != 0:
-                            while True:
-                                b = reader.read_bytes(1)[0]
-                                if (b & 0x80) == 0:
-                                    break
-                    except Exception:
-                        break
-
-            # BUILD_ID validation on first packet
-            if first_packet and validate_build_id and expected_build_id is not None:
-                first_packet = False
-                # Check if this is a BUILD_ID message
-                if entry and 'BUILD_ID' in entry['fmt']:
-                    if args and (args[0] & 0xFFFFFFFF) != (expected_build_id & 0xFFFFFFFF):
-                        print(json.dumps({
-                            'ts': datetime.now(timezone.utc).isoformat(),
-                            'level': 'FATAL',
-                            'msg': f'BUILD_ID mismatch! Firmware=0x{args[0] & 0xFFFFFFFF:08x}, '
-                                   f'CSV=0x{expected_build_id & 0xFFFFFFFF:08x}',
-                        }), file=out, flush=True)
-                        print("FATAL: BUILD_ID mismatch — firmware and CSV out of sync!",
-                              file=sys.stderr)
-                        sys.exit(2)
+                    # Unknown token
+                    token_hex = f'0x{token_id:08x}'
+                    record = {
+                        'ts': ts,
+                        'level': LEVEL_BY_NIBBLE[level],
+                        'msg': f'<unknown token {token_hex}>',
+                        'token': token_hex,
+                        'raw_args': [],
+                    }
+
+                    # Try to skip arg_count args (best effort): in one SWAR scan
+                    # when they are buffered, else byte by byte as they arrive
+                    skip_to = None
+                    if arg_count:
+                        skip_to = skip_varints(reader.buf, reader.head, arg_count,
+                                               reader.tail)
+                    if skip_to is not None:
+                        reader.skip(skip_to - reader.head)
                     else:
-                        record['_build_id_verified'] = True
-
-            # Emit JSON line
-            print(json.dumps(record), file=out, flush=True)
-            packet_count += 1
-
-        except ConnectionError:
-            print(f"\nConnection lost after {packet_count} packets.", file=sys.stderr)
-            break
-        except KeyboardInterrupt:
-            print(f"\nStopped after {packet_count} packets.", file=sys.stderr)
-            break
-        except Exception as e:
-            print(json.dumps({
-                'ts': datetime.now(timezone.utc).isoformat(),
-                'level': 'DECODER_ERROR',
-                'msg': str(e),
-            }), file=out, flush=True)
+                        try:
+                            for _ in range(arg_count):
+                                while reader.read_bytes(1)[0] & 0x80:
+                                    pass  # Continuation byte
+                        except ConnectionError:
+                            pass  # Still emit the record; the next read reports it
+
+                # BUILD_ID validation on first packet
+                if first_packet and validate_build_id and expected_build_id is not None:
+                    first_packet = False
+                    # Check if this is a BUILD_ID message
+                    if entry and 'BUILD_ID' in entry.fmt:
+                        if args and (args[0] & 0xFFFFFFFF) != (expected_build_id & 0xFFFFFFFF):
+                            pending.append(encode_jsonl({
+                                'ts': ts,
+                                'level': 'FATAL',
+                                'msg': f'BUILD_ID mismatch! Firmware=0x{args[0] & 0xFFFFFFFF:08x}, '
+                                       f'CSV=0x{expected_build_id & 0xFFFFFFFF:08x}',
+                            }))
+                            _flush()
+                            print("FATAL: BUILD_ID mismatch — firmware and CSV out of sync!",
+                                  file=sys.stderr)
+                            sys.exit(2)
+                        else:
+                            record['_build_id_verified'] = True
+
+                # Queue the JSON line; the batch is written once full, or by
+                # the reader before it next waits for data
+                pending.append(encode_jsonl(record))
+                packet_count += 1
+                if len(pending) >= OUTPUT_BATCH_LINES:
+                    _flush()
+
+            except ConnectionError:
+                raise  # Handled once, below
+            except Exception as e:
+                pending.append(encode_jsonl({
+                    'ts': utc_timestamp(),
+                    'level': 'DECODER_ERROR',
+                    'msg': str(e),
+                }))
+                _flush()
+    except ConnectionError:
+        _flush()
+        print(f"\nConnection lost after {packet_count} packets.", file=sys.stderr)
+    except KeyboardInterrupt:
+        _flush()
+        print(f"\nStopped after {packet_count} packets.", file=sys.stderr)
+
+
+# Requested kernel receive buffer for the RTT socket. Set before connect()
+# so TCP can negotiate a matching window scale; Linux caps it at
+# net.core.rmem_max (raise that to >= 4194304 for the full size).
+RTT_RCVBUF_SIZE = 4 * 1024 * 1024
 
 
 def connect_with_retry(host: str, port: int, max_retries: int = 10,
@@ -388,14 +764,27 @@ def connect_with_retry(host: str, port: int, max_retries: int = 10,
     """Connect to RTT TCP server with exponential backoff."""
     delay = base_delay
     for attempt in range(max_retries):
+        sock = None
         try:
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            # A large buffer absorbs log bursts while the decoder is busy
+            # formatting, so OpenOCD is not throttled and each recv_into()
+            # returns more data.
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RTT_RCVBUF_SIZE)
+            except OSError:
+                pass  # Keep the default size
             sock.settimeout(5.0)
             sock.connect((host, port))
-            sock.settimeout(2.0)  # Read timeout
+            # Fully blocking reads: the reader only wakes when data (or EOF)
+            # arrives, instead of timing out every 2 s on an idle stream.
+            # Ctrl-C still interrupts a blocked recv.
+            sock.settimeout(None)
             print(f"Connected to {host}:{port}", file=sys.stderr)
             return sock
         except (ConnectionRefusedError, socket.timeout, OSError) as e:
+            if sock is not None:
+                sock.close()
             print(f"Connection attempt {attempt + 1}/{max_retries} failed: {e}",
                   file=sys.stderr)
             if attempt < max_retries - 1:
@@ -467,7 +856,7 @@ Examples:
     # Open output file if specified
     output_file = None
     if args.output:
-        output_file = open(args.output, 'w', encoding='utf-8')
+        output_file = open(args.output, 'wb')
         print(f"Writing output to: {args.output}", file=sys.stderr)
 
     try:
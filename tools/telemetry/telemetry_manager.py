@@ -14,12 +14,15 @@ Usage:
     python telemetry_manager.py [--host HOST] [--port PORT] [--output DIR]
     python telemetry_manager.py --host localhost --port 9092 --output ./telemetry_data
 
-Dependencies: Python 3.8+ stdlib only (socket, struct, json, argparse)
+Dependencies: Python 3.8+ stdlib only (socket, struct, json, argparse);
+orjson is used for JSON output when installed
 """
 
 import argparse
 import json
 import os
+import select
+import signal
 import socket
 import struct
 import sys
@@ -27,6 +30,11 @@ import time
 from datetime import datetime, timezone
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # Optional: stdlib json is used when orjson is absent
+    orjson = None
+
 
 # ===========================================================================
 # Binary Packet Format (must match firmware/components/telemetry/include/telemetry.h)
@@ -39,10 +47,12 @@ PKT_TASK_STATS = 0x02
 # System vitals header: [type:1][timestamp:4][free_heap:4][min_free_heap:4][task_count:1]
 HEADER_FORMAT = "<BIIIB"
 HEADER_SIZE = struct.calcsize(HEADER_FORMAT)  # 14 bytes
+_HEADER = struct.Struct(HEADER_FORMAT)
 
 # Per-task entry: [task_number:1][state:1][priority:1][stack_hwm:2][cpu_pct:1][runtime:2]
 TASK_ENTRY_FORMAT = "<BBBHBH"
 TASK_ENTRY_SIZE = struct.calcsize(TASK_ENTRY_FORMAT)  # 8 bytes
+_TASK_ENTRY = struct.Struct(TASK_ENTRY_FORMAT)
 
 # Task state names (FreeRTOS eTaskState enum)
 TASK_STATES = {
@@ -53,6 +63,10 @@ TASK_STATES = {
     4: "Deleted",
 }
 
+# State name for every value of the 1-byte state field, so decoding is a
+# tuple index rather than a dict probe with a formatted default
+_STATE_BY_BYTE = tuple(TASK_STATES.get(i, f"Unknown({i})") for i in range(256))
+
 # ===========================================================================
 # Alert Thresholds
 # ===========================================================================
@@ -61,6 +75,7 @@ ALERT_HEAP_LOW = 4096       # Bytes — critical if free heap drops below this
 ALERT_HEAP_SLOPE = -10.0    # Bytes/second — sustained negative slope = leak
 ALERT_STACK_HWM_LOW = 32    # Words — stack nearly exhausted
 SUMMARY_INTERVAL_S = 300    # 5 minutes between summary reports
+RAW_FLUSH_INTERVAL_S = 5.0  # Max age of buffered raw samples before a flush
 
 
 # ===========================================================================
@@ -72,35 +87,45 @@ def decode_vitals_packet(data: bytes) -> dict | None:
 
     Returns None if the data is too short or has an unexpected type.
     """
-    if len(data) < HEADER_SIZE:
+    available = len(data)
+    if available < HEADER_SIZE:
         return None
 
-    pkt_type, timestamp, free_heap, min_free_heap, task_count = struct.unpack_from(
-        HEADER_FORMAT, data, 0
+    pkt_type, timestamp, free_heap, min_free_heap, task_count = _HEADER.unpack_from(
+        data
     )
 
     if pkt_type != PKT_SYSTEM_VITALS:
         return None  # Not a system vitals packet
 
     expected_size = HEADER_SIZE + task_count * TASK_ENTRY_SIZE
-    if len(data) < expected_size:
+    if available < expected_size:
         return None  # Truncated packet
 
-    tasks = []
-    offset = HEADER_SIZE
-    for _ in range(task_count):
-        task_num, state, priority, stack_hwm, cpu_pct, runtime = struct.unpack_from(
-            TASK_ENTRY_FORMAT, data, offset
-        )
-        tasks.append({
-            "task_number": task_num,
-            "state": TASK_STATES.get(state, f"Unknown({state})"),
-            "priority": priority,
-            "stack_hwm_words": stack_hwm,
-            "cpu_pct": cpu_pct,
-            "runtime_ms": runtime,
-        })
-        offset += TASK_ENTRY_SIZE
+    with memoryview(data) as view:
+        return _build_vitals(view, 0, timestamp, free_heap, min_free_heap,
+                             task_count)
+
+
+def _build_vitals(view: memoryview, offset: int, timestamp: int, free_heap: int,
+                  min_free_heap: int, task_count: int) -> dict:
+    """Build the vitals dict for a complete packet at offset in view."""
+    # All task entries in one C-level pass; no per-entry offset arithmetic.
+    # The slice is released on exit so a bytearray buffer can be resized.
+    start = offset + HEADER_SIZE
+    with view[start:start + task_count * TASK_ENTRY_SIZE] as entries:
+        tasks = [
+            {
+                "task_number": task_num,
+                "state": _STATE_BY_BYTE[state],
+                "priority": priority,
+                "stack_hwm_words": stack_hwm,
+                "cpu_pct": cpu_pct,
+                "runtime_ms": runtime,
+            }
+            for task_num, state, priority, stack_hwm, cpu_pct, runtime
+            in _TASK_ENTRY.iter_unpack(entries)
+        ]
 
     return {
         "type": "system_vitals",
@@ -112,6 +137,18 @@ def decode_vitals_packet(data: bytes) -> dict | None:
     }
 
 
+def encode_jsonl(obj) -> bytes:
+    """Serialize obj as one compact UTF-8 JSON line, newline included.
+
+    Uses orjson when installed, falling back to the stdlib json module with
+    the same format (no spaces after separators, non-ASCII unescaped).
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+            + "\n").encode("utf-8")
+
+
 # ===========================================================================
 # Analytics Engine
 # ===========================================================================
@@ -128,10 +165,18 @@ class TelemetryAnalytics:
         self.alert_path = self.output_dir / "telemetry_alerts.jsonl"
 
         # Tracking state for analytics
-        self.samples = []
+        # Summary window: only running values are kept — the first and
+        # latest heap sample (all the slope needs), sample count and minima
+        self._reset_window_stats()
+        self.last_task_count = 0
         self.last_summary_time = time.monotonic()
         self.sample_count = 0
 
+        # JSONL files stay open (opened on first write); raw samples are
+        # flushed every RAW_FLUSH_INTERVAL_S, alerts and summaries at once
+        self._files = {}
+        self.last_raw_flush = self.last_summary_time
+
     def process_packet(self, vitals: dict) -> list[dict]:
         """Process a decoded vitals packet through all tiers.
 
@@ -142,8 +187,21 @@ class TelemetryAnalytics:
         vitals["received_at"] = iso_now
 
         # --- Tier 1: Passive — log everything ---
-        self._write_jsonl(self.raw_path, vitals)
-        self.samples.append(vitals)
+        self._write_jsonl(self.raw_path, vitals, flush=False)
+        if now - self.last_raw_flush >= RAW_FLUSH_INTERVAL_S:
+            self.flush_raw(now)
+        free_heap = vitals["free_heap"]
+        if not self.window_samples:
+            self.heap_first = free_heap
+        self.heap_last = free_heap
+        self.window_samples += 1
+        self.heap_min = min(self.heap_min, free_heap)
+        self.min_ever_free_heap = min(self.min_ever_free_heap, vitals["min_free_heap"])
+        tasks = vitals.get("tasks")
+        if tasks:
+            self.min_stack_hwm = min(self.min_stack_hwm,
+                                     min(task["stack_hwm_words"] for task in tasks))
+        self.last_task_count = vitals.get("task_count", 0)
         self.sample_count += 1
 
         events = []
@@ -161,10 +219,18 @@ class TelemetryAnalytics:
                 self._write_jsonl(self.summary_path, summary)
                 events.append(summary)
             self.last_summary_time = now
-            self.samples.clear()
+            self._reset_window_stats()
 
         return events
 
+    def _reset_window_stats(self):
+        """Start new running values for the next summary window."""
+        self.window_samples = 0
+        self.heap_first = self.heap_last = None
+        self.heap_min = float("inf")
+        self.min_ever_free_heap = float("inf")
+        self.min_stack_hwm = float("inf")
+
     def _check_alerts(self, vitals: dict, timestamp: str) -> list[dict]:
         """Check for threshold violations."""
         alerts = []
@@ -202,53 +268,65 @@ class TelemetryAnalytics:
 
     def _generate_summary(self, timestamp: str) -> dict | None:
         """Generate a 5-minute summary from accumulated samples."""
-        if not self.samples:
+        n = self.window_samples
+        if not n:
             return None
-
-        heap_values = [s["free_heap"] for s in self.samples]
-        min_heap_values = [s["min_free_heap"] for s in self.samples]
+        heap_min = self.heap_min
 
         # Calculate heap slope (bytes per second)
         heap_slope = 0.0
-        if len(heap_values) >= 2:
-            # Simple linear regression approximation
-            n = len(heap_values)
-            interval_s = SUMMARY_INTERVAL_S / n if n > 0 else 0.5
-            heap_slope = (heap_values[-1] - heap_values[0]) / (n * interval_s)
+        if n >= 2:
+            # Simple linear regression approximation: first to latest sample
+            interval_s = SUMMARY_INTERVAL_S / n
+            heap_slope = (self.heap_last - self.heap_first) / (n * interval_s)
 
         # Determine status
         status = "nominal"
         if heap_slope < ALERT_HEAP_SLOPE:
             status = "heap_leak_suspected"
-        elif min(heap_values) < ALERT_HEAP_LOW * 2:
+        elif heap_min < ALERT_HEAP_LOW * 2:
             status = "heap_caution"
 
-        # Peak stack usage across all tasks
+        # Peak stack usage across all tasks: the lowest watermark seen
+        # Rough estimate: assume 256 words allocated, HWM is remaining
         peak_stack_pct = 0
-        for sample in self.samples:
-            for task in sample.get("tasks", []):
-                # Rough estimate: assume 256 words allocated, HWM is remaining
-                used_pct = max(0, 100 - (task["stack_hwm_words"] * 100 // 256))
-                peak_stack_pct = max(peak_stack_pct, used_pct)
+        if self.min_stack_hwm != float("inf"):
+            peak_stack_pct = max(0, 100 - (self.min_stack_hwm * 100 // 256))
 
         return {
             "type": "summary",
             "timestamp": timestamp,
             "status": status,
-            "sample_count": len(self.samples),
-            "heap_current": heap_values[-1],
-            "heap_min": min(heap_values),
+            "sample_count": n,
+            "heap_current": self.heap_last,
+            "heap_min": heap_min,
             "heap_slope_bytes_per_sec": round(heap_slope, 2),
-            "min_ever_free_heap": min(min_heap_values),
+            "min_ever_free_heap": self.min_ever_free_heap,
             "peak_stack_usage_pct": peak_stack_pct,
-            "task_count": self.samples[-1].get("task_count", 0),
+            "task_count": self.last_task_count,
         }
 
-    @staticmethod
-    def _write_jsonl(path: Path, data: dict):
-        """Append a JSON line to a file."""
-        with open(path, "a") as f:
-            f.write(json.dumps(data) + "\n")
+    def flush_raw(self, now: float = None):
+        """Write out buffered raw samples (also called when the stream is idle)."""
+        f = self._files.get(self.raw_path)
+        if f is not None:
+            f.flush()
+        self.last_raw_flush = time.monotonic() if now is None else now
+
+    def _write_jsonl(self, path: Path, data: dict, flush: bool = True):
+        """Append a JSON line to a file, keeping the file open."""
+        f = self._files.get(path)
+        if f is None:
+            f = self._files[path] = open(path, "ab", buffering=1 << 16)
+        f.write(encode_jsonl(data))
+        if flush:
+            f.flush()
+
+    def close(self):
+        """Flush and close all open JSONL files."""
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
 
 
 # ===========================================================================
@@ -262,7 +340,7 @@ def connect_rtt(host: str, port: int, timeout: float = 5.0) -> socket.socket:
     for attempt in range(10):
         try:
             sock = socket.create_connection((host, port), timeout=timeout)
-            sock.settimeout(2.0)  # Read timeout for packet assembly
+            sock.setblocking(False)  # read_packets() waits with poll()
             print(f"[telemetry_manager] Connected to RTT Channel 2", file=sys.stderr)
             return sock
         except (ConnectionRefusedError, OSError) as e:
@@ -275,56 +353,87 @@ def connect_rtt(host: str, port: int, timeout: float = 5.0) -> socket.socket:
     raise ConnectionError(f"Failed to connect to {host}:{port} after 10 attempts")
 
 
-def read_packets(sock: socket.socket) -> bytes:
+# Size of the reusable receive buffer handed to read_packets()
+RECV_BUFFER_SIZE = 65536
+
+# How long read_packets() waits for data before returning empty
+READ_TIMEOUT_S = 2.0
+
+# Framed bytes are dropped from the front of the framing buffer once this
+# many have accumulated (or when no partial packet is left)
+BUFFER_COMPACT_THRESHOLD = 32768
+
+
+def read_packets(sock: socket.socket, rxbuf: memoryview) -> memoryview:
     """Read available data from the RTT TCP socket.
 
-    Returns raw bytes (may contain partial or multiple packets).
+    Data is received straight into rxbuf, a buffer the caller reuses for
+    every read, so no bytes object is allocated per recv. Returns a view
+    of the received bytes (empty on timeout), valid until the next call.
     RTT TCP is a raw byte stream — we need to frame packets ourselves.
+
+    The socket is non-blocking: while data keeps arriving, each read is a
+    single recv_into() system call, and poll() is only used to wait (up to
+    READ_TIMEOUT_S) once the socket has been drained. A socket with a
+    timeout would poll before every receive.
     """
     try:
-        return sock.recv(4096)
-    except socket.timeout:
-        return b""
+        n = sock.recv_into(rxbuf)
+    except BlockingIOError:
+        poller = select.poll()
+        poller.register(sock, select.POLLIN)
+        if not poller.poll(READ_TIMEOUT_S * 1000):
+            return rxbuf[:0]
+        n = sock.recv_into(rxbuf)
     except ConnectionResetError:
         raise
+    return rxbuf[:n]
 
 
-def extract_packets(buffer: bytes) -> tuple[list[bytes], bytes]:
-    """Extract complete vitals packets from a byte buffer.
+def parse_packets(buffer, offset: int = 0) -> tuple[list[dict], int]:
+    """Frame and decode vitals packets in one pass over a byte buffer.
 
-    Since packets are variable-length (header + N × task_entry), we parse
-    the header to determine the full packet size.
+    Since packets are variable-length (header + N × task_entry), the header
+    gives the full packet size; each header is unpacked once and its values
+    are also the ones decoded. Scanning starts at offset, so a caller can
+    keep one receive buffer and consume it by index, without copying.
 
-    Returns (list_of_complete_packets, remaining_buffer).
+    Returns (list of vitals dicts, offset of the first unconsumed byte).
     """
     packets = []
-    offset = 0
+    end = len(buffer)
+    unpack_header = _HEADER.unpack_from
 
-    while offset + HEADER_SIZE <= len(buffer):
-        # Peek at header to get task_count
-        pkt_type, _, _, _, task_count = struct.unpack_from(
-            HEADER_FORMAT, buffer, offset
-        )
+    with memoryview(buffer) as view:
+        while offset + HEADER_SIZE <= end:
+            pkt_type, timestamp, free_heap, min_free_heap, task_count = (
+                unpack_header(view, offset))
 
-        if pkt_type != PKT_SYSTEM_VITALS:
-            # Unknown packet type — skip one byte and try again
-            offset += 1
-            continue
+            if pkt_type != PKT_SYSTEM_VITALS:
+                # Unknown packet type — skip one byte and try again
+                offset += 1
+                continue
 
-        packet_size = HEADER_SIZE + task_count * TASK_ENTRY_SIZE
-        if offset + packet_size > len(buffer):
-            break  # Incomplete packet — wait for more data
+            packet_size = HEADER_SIZE + task_count * TASK_ENTRY_SIZE
+            if offset + packet_size > end:
+                break  # Incomplete packet — wait for more data
 
-        packets.append(buffer[offset : offset + packet_size])
-        offset += packet_size
+            packets.append(_build_vitals(view, offset, timestamp, free_heap,
+                                         min_free_heap, task_count))
+            offset += packet_size
 
-    return packets, buffer[offset:]
+    return packets, offset
 
 
 # ===========================================================================
 # Main
 # ===========================================================================
 
+def _signal_handler(signum, frame):
+    # Exit through main()'s finally so buffered raw samples are written
+    sys.exit(128 + signum)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="BB4 Telemetry Manager — RTT Channel 2 decoder"
@@ -352,24 +461,28 @@ def main():
         f"[telemetry_manager] Summary interval: {SUMMARY_INTERVAL_S}s", file=sys.stderr
     )
 
+    signal.signal(signal.SIGTERM, _signal_handler)
+
     sock = connect_rtt(args.host, args.port)
-    buffer = b""
+    rxbuf = memoryview(bytearray(RECV_BUFFER_SIZE))
+    buffer = bytearray()
+    consumed = 0  # Bytes at the front of buffer already framed
     total_packets = 0
 
     try:
         while True:
-            data = read_packets(sock)
+            data = read_packets(sock, rxbuf)
             if not data:
+                # Quiet stream: don't leave raw samples sitting in the buffer
+                analytics.flush_raw()
                 continue
 
+            # Frame and decode in place; consumed bytes are dropped from the
+            # front only once they add up (or nothing is left over)
             buffer += data
-            packets, buffer = extract_packets(buffer)
-
-            for pkt_data in packets:
-                vitals = decode_vitals_packet(pkt_data)
-                if vitals is None:
-                    continue
+            packets, consumed = parse_packets(buffer, consumed)
 
+            for vitals in packets:
                 total_packets += 1
                 events = analytics.process_packet(vitals)
 
@@ -382,10 +495,14 @@ def main():
                     )
 
                 # Print alerts/summaries to stdout (for AI consumption)
-                for event in events:
-                    print(json.dumps(event))
+                if events:
+                    sys.stdout.buffer.write(b"".join(map(encode_jsonl, events)))
                     sys.stdout.flush()
 
+            if consumed == len(buffer) or consumed >= BUFFER_COMPACT_THRESHOLD:
+                del buffer[:consumed]
+                consumed = 0
+
     except KeyboardInterrupt:
         print(
             f"\n[telemetry_manager] Stopped. {total_packets} packets processed.",
@@ -395,6 +512,7 @@ def main():
         print("[telemetry_manager] Connection reset by peer", file=sys.stderr)
     finally:
         sock.close()
+        analytics.close()
 
 
 if __name__ == "__main__":